@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import random
 import os
 
+
 st.set_page_config(page_title="AgriConnect Dashboard", layout="wide")
 
 def insight_card(title, insight_text, color="#e3f2fd"):
@@ -138,15 +139,6 @@ def add_temp_log(facility_id, temperature):
     conn.commit()
     conn.close()
 
-CROP_TEMP_THRESHOLDS = {
-    "maize": 27, "rice": 25, "cassava": 25, "wheat": 26, "yam": 24, "other": 26
-}
-def phl_prompt(crop_name, temp):
-    thresh = CROP_TEMP_THRESHOLDS.get(crop_name.lower(), CROP_TEMP_THRESHOLDS["other"])
-    if temp > thresh:
-        return f"⚠️ Storage temperature ({temp}°C) is too high for {crop_name.title()}! Reduce temperature to below {thresh}°C to prevent post-harvest losses."
-    return f"✅ Temperature is safe for {crop_name.title()}."
-
 def populate_farmer_with_full_crop_and_temps():
     conn = sqlite3.connect(DB_PATH_FARMERS)
     c = conn.cursor()
@@ -3,6 +3,9 @@ import pandas as pd
 import sqlite3
 from datetime import datetime
 
+from portal_queries import ensure_indexes, phl_prompt_rows
+from temp_rollups import CHART_WINDOWS, install as install_rollups, temp_series
+
 st.set_page_config(page_title="AgriConnect Farmer Portal", layout="wide")
 
 DB_PATH = "agriconnect_farmers.db"
@@ -44,7 +47,9 @@ def init_db():
             FOREIGN KEY(facility_id) REFERENCES facilities(facility_id)
         )
     """)
+    ensure_indexes(conn)
     conn.commit()
+    install_rollups(conn)
     conn.close()
 
 def get_user(username, password=None):
@@ -121,22 +126,6 @@ def get_facility_name(facility_id):
     conn.close()
     return row[0] if row else "Unknown"
 
-# --- PHYSICAL THRESHOLDS for PHL risk (example values) ---
-CROP_TEMP_THRESHOLDS = {
-    "maize": 27,
-    "rice": 25,
-    "cassava": 25,
-    "wheat": 26,
-    "yam": 24,
-    "other": 26
-}
-
-def phl_prompt(crop_name, temp):
-    thresh = CROP_TEMP_THRESHOLDS.get(crop_name.lower(), CROP_TEMP_THRESHOLDS["other"])
-    if temp > thresh:
-        return f"⚠️ Storage temperature ({temp}°C) is too high for {crop_name.title()}! Reduce temperature to below {thresh}°C to prevent post-harvest losses."
-    return f"✅ Temperature is safe for {crop_name.title()}."
-
 # ----------- APP START -----------
 init_db()
 
@@ -236,7 +225,10 @@ def main_dashboard():
             # Show logs
             tdf = get_temp_logs(fac_id)
             if len(tdf):
-                st.line_chart(tdf.sort_values("log_time")["temperature"], use_container_width=True)
+                window = st.selectbox("Chart window", list(CHART_WINDOWS), key=f"temp_window_{fac_id}")
+                series, level = temp_series(fac_id, CHART_WINDOWS[window], DB_PATH)
+                st.line_chart(series.set_index("log_time")[["min_temp", "temperature", "max_temp"]], use_container_width=True)
+                st.caption(f"{len(series)} points from {level}")
                 st.dataframe(tdf[["temperature", "log_time"]])
             else:
                 st.info("No temperature logs yet.")
@@ -247,18 +239,16 @@ def main_dashboard():
     # ---- PHL Prompts ----
     with tabs[3]:
         st.subheader("PHL Reduction Prompts")
-        fdf = get_facilities(st.session_state["user"]["user_id"])
-        if len(fdf):
-            for i, row in fdf.iterrows():
+        pdf = phl_prompt_rows(st.session_state["user"]["user_id"], DB_PATH)
+        if len(pdf):
+            for _, fac in pdf.groupby("facility_id", sort=False):
+                row = fac.iloc[0]
                 st.markdown(f"### Facility: {row['name']} ({row['location']})")
-                cdf = get_crops(row["facility_id"])
-                tdf = get_temp_logs(row["facility_id"], limit=1)
-                if len(cdf) and len(tdf):
-                    last_temp = tdf.iloc[0]["temperature"]
-                    for _, crop in cdf.iterrows():
-                        prompt = phl_prompt(crop["crop_name"], last_temp)
-                        st.info(f"{crop['crop_name'].title()}: {prompt}")
-                elif len(cdf):
+                crops = fac[fac["crop_name"].notna()]
+                if len(crops) and pd.notna(row["temperature"]):
+                    for _, crop in crops.iterrows():
+                        st.info(f"{crop['crop_name'].title()}: {crop['prompt']}")
+                elif len(crops):
                     st.warning("No temperature logs yet.")
                 else:
                     st.warning("No crops in this facility.")
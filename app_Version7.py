@@ -4,6 +4,11 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+import feature_importance
+import integrated_store
+import score_explanations
+import what_if
+
 # --------- SET PAGE CONFIG FIRST ---------
 st.set_page_config(page_title="AgriConnect Dashboard", layout="wide")
 
@@ -43,7 +48,7 @@ with st.sidebar:
 
 # --------- LOAD DATA ---------
 try:
-    df = pd.read_csv("integrated_results.csv")
+    df = integrated_store.read_integrated()
     regions = df['region'].dropna().unique().tolist()
     min_score = float(df['predicted_credit_score'].min())
     max_score = float(df['predicted_credit_score'].max())
@@ -134,15 +139,13 @@ with tab2:
 
         st.subheader("Feature Importances")
         try:
-            feature_names = [
-                'age', 'education', 'farm_size', 'crop_type', 'region', 'tech_literacy',
-                'financial_access', 'prev_loan', 'phl_risk_score', 'avg_annual_phl_loss', 'interventions_adopted'
-            ]
-            importances = np.random.dirichlet(np.ones(len(feature_names)),size=1).flatten()
-            imp_df = pd.DataFrame({"Feature": feature_names, "Importance": importances})
-            imp_df = imp_df.sort_values("Importance", ascending=True)
-            fig_imp = px.bar(imp_df, x="Importance", y="Feature", orientation='h', color="Importance", color_continuous_scale='Greens')
-            st.plotly_chart(fig_imp, use_container_width=True)
+            imp_df = feature_importance.load_importances("phl_credit")
+            if imp_df is None:
+                st.info("Feature importances have not been computed yet. Run phl_credit_pipeline.py to train the model.")
+            else:
+                imp_df = imp_df.sort_values("Importance", ascending=True)
+                fig_imp = px.bar(imp_df, x="Importance", y="Feature", orientation='h', color="Importance", color_continuous_scale='Greens')
+                st.plotly_chart(fig_imp, use_container_width=True)
         except Exception as e:
             st.warning(f"Feature importance error: {e}")
 
@@ -186,6 +189,14 @@ with tab3:
             farmer_row = filtered_df[filtered_df['farmer_id'] == selected_farmer]
             st.write(f"### Farmer Profile: {selected_farmer}")
             st.json(farmer_row.to_dict(orient='records')[0])
+            explanation = score_explanations.get_explanation(selected_farmer)
+            if explanation:
+                st.markdown("**Why this score?**")
+                st.caption(f"Baseline score {explanation['base_value']:.2f}. Positive contributions raise this farmer's score, negative ones lower it.")
+                st.dataframe(pd.DataFrame(explanation["top_features"], columns=["Feature", "Contribution"]))
+            else:
+                st.caption("No score explanation stored yet. Run score_explanations.py after the pipeline.")
+            what_if.render_what_if(farmer_row.to_dict(orient='records')[0])
     except Exception as e:
         st.warning(f"Could not display farmer profile: {e}")
 
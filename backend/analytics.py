@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+from collections import defaultdict
+
+from backend.prediction_log import DB_PATH, INSERT_COLS, init_db
+
+CREDITWORTHY_IDX = INSERT_COLS.index("creditworthy")
+TIMESTAMP_IDX = INSERT_COLS.index("timestamp")
+
+def init_counts_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS prediction_counts (
+            day TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            creditworthy INTEGER NOT NULL
+        )
+    """)
+    conn.commit()
+
+def count_rows(rows):
+    # {day: [total, creditworthy]} for a batch of logged prediction rows
+    counts = defaultdict(lambda: [0, 0])
+    for row in rows:
+        c = counts[row[TIMESTAMP_IDX][:10]]
+        c[0] += 1
+        c[1] += row[CREDITWORTHY_IDX]
+    return counts
+
+def summarize(total, creditworthy):
+    return {
+        "total": total,
+        "creditworthy": creditworthy,
+        "not_creditworthy": total - creditworthy,
+        "percent_creditworthy": (100.0 * creditworthy / total) if total else 0.0,
+    }
+
+class SummaryCounters:
+    # Running prediction counts, overall and per day. The prediction_counts table is updated in
+    # the same transaction as each logged batch, and the in-memory copy after it commits, so
+    # /analytics/summary never has to scan the predictions table.
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._total = 0
+        self._creditworthy = 0
+        self._days = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            init_db(conn)
+            init_counts_table(conn)
+            days = conn.execute("SELECT day, total, creditworthy FROM prediction_counts").fetchall()
+            if not days:
+                # One-off backfill for predictions logged before the counters existed
+                with conn:
+                    conn.execute("""
+                        INSERT INTO prediction_counts (day, total, creditworthy)
+                        SELECT substr(timestamp, 1, 10), COUNT(*), COALESCE(SUM(creditworthy), 0)
+                        FROM predictions GROUP BY substr(timestamp, 1, 10)
+                    """)
+                days = conn.execute("SELECT day, total, creditworthy FROM prediction_counts").fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._days = {day: [total, cw] for day, total, cw in days}
+            self._total = sum(v[0] for v in self._days.values())
+            self._creditworthy = sum(v[1] for v in self._days.values())
+
+    def write_counts(self, conn, rows):
+        # Flush hook: runs inside the logger's transaction
+        conn.executemany(
+            "INSERT INTO prediction_counts (day, total, creditworthy) VALUES (?, ?, ?) "
+            "ON CONFLICT(day) DO UPDATE SET total=total+excluded.total, creditworthy=creditworthy+excluded.creditworthy",
+            [(day, c[0], c[1]) for day, c in count_rows(rows).items()]
+        )
+
+    def apply(self, rows):
+        # Listener: runs after the logger's transaction commits
+        counts = count_rows(rows)
+        with self._lock:
+            for day, (total, cw) in counts.items():
+                d = self._days.setdefault(day, [0, 0])
+                d[0] += total
+                d[1] += cw
+                self._total += total
+                self._creditworthy += cw
+
+    def summary(self, day=None):
+        # Constant time: reads the in-memory counters only
+        with self._lock:
+            if day is None:
+                return summarize(self._total, self._creditworthy)
+            total, cw = self._days.get(day, (0, 0))
+            return summarize(total, cw)
+
+def etag(summary, day=None):
+    # Derived from the counts themselves so it stays valid across restarts
+    return f'W/"{day or "all"}-{summary["total"]}-{summary["creditworthy"]}"'
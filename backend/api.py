@@ -0,0 +1,106 @@
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+
+from backend.analytics import SummaryCounters, etag
+from backend.batching import MicroBatcher
+from backend.prediction_log import PredictionLogger
+from backend.scoring import load_scorer, encode_record
+
+THRESHOLD = 0.5
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+
+class FarmerInput(BaseModel):
+    age: int
+    education_level: str
+    farm_size: float
+    phone_type: str
+    financial_access: str
+    experience_years: int
+    extension_access: str
+    cooperative_member: str
+    irrigation_access: str
+    dependents: int
+    gender: str
+
+class BatchInput(BaseModel):
+    farmers: List[FarmerInput]
+
+state = {}
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the active model once per process
+    scorer = load_scorer()
+    batcher = MicroBatcher(scorer.predict_proba, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS)
+    await batcher.start()
+    counters = SummaryCounters()
+    counters.load()
+    logger = PredictionLogger()
+    logger.add_flush_hook(counters.write_counts)
+    logger.add_listener(counters.apply)
+    logger.start()
+    state["counters"] = counters
+    state["scorer"] = scorer
+    state["batcher"] = batcher
+    state["logger"] = logger
+    yield
+    await batcher.stop()
+    logger.stop()
+    state.clear()
+
+app = FastAPI(title="AgriConnect Scoring API", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+def _result(prob):
+    return {"creditworthy": int(prob >= THRESHOLD), "probability": round(float(prob), 4)}
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "model_version": state["scorer"].version,
+        "batching": state["batcher"].stats(),
+        "logging": state["logger"].stats(),
+    }
+
+@app.post("/predict")
+async def predict(farmer: FarmerInput):
+    record = farmer.model_dump()
+    prob = await state["batcher"].submit(encode_record(record))
+    result = _result(prob)
+    state["logger"].log(record, result["creditworthy"], result["probability"])
+    return {**result, "model_version": state["scorer"].version}
+
+@app.post("/predict/batch")
+async def predict_batch(batch: BatchInput):
+    # Explicit batches bypass the micro-batcher and go straight to the model
+    records = [f.model_dump() for f in batch.farmers]
+    if not records:
+        return {"predictions": [], "model_version": state["scorer"].version}
+    probs = await run_in_threadpool(state["scorer"].predict_proba, [encode_record(r) for r in records])
+    results = [_result(p) for p in probs]
+    for record, result in zip(records, results):
+        state["logger"].log(record, result["creditworthy"], result["probability"])
+    return {"predictions": results, "model_version": state["scorer"].version}
+
+@app.get("/analytics/summary")
+async def analytics_summary(request: Request, response: Response, day: Optional[str] = None):
+    # day is YYYY-MM-DD; omit it for the all-time summary
+    summary = state["counters"].summary(day)
+    tag = etag(summary, day)
+    if request.headers.get("if-none-match") == tag:
+        return Response(status_code=304, headers={"ETag": tag})
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = "no-cache"
+    return summary
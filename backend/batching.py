@@ -0,0 +1,78 @@
+import asyncio
+
+class MicroBatcher:
+    # Coalesces concurrent single-row requests into one predict_proba call.
+    # A batch is dispatched when it reaches max_batch_size or max_wait_ms after its first row.
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued before waiting
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = [row for row, _ in batch]
+            try:
+                # Run the model off the event loop so requests keep queueing meanwhile
+                probs = await loop.run_in_executor(None, self.predict_fn, rows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(rows)
+            for (_, future), prob in zip(batch, probs):
+                if not future.done():
+                    future.set_result(float(prob))
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": (self.rows / self.batches) if self.batches else 0.0,
+        }
@@ -0,0 +1,66 @@
+import argparse
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Fires concurrent single-row /predict requests at the scoring API and reports latency percentiles.
+# Usage: uvicorn backend.api:app --port 8000, then python -m backend.loadgen --requests 2000 --concurrency 32
+
+def random_farmer(rng):
+    age = rng.randint(18, 35)
+    return {
+        "age": age,
+        "education_level": rng.choice(["Primary", "Secondary", "Tertiary"]),
+        "farm_size": round(rng.uniform(0.5, 5.0), 1),
+        "phone_type": rng.choice(["Basic phone", "Feature phone", "Smartphone"]),
+        "financial_access": rng.choice(["None", "Limited", "Some", "Full"]),
+        "experience_years": rng.randint(0, age - 16),
+        "extension_access": rng.choice(["Yes", "No"]),
+        "cooperative_member": rng.choice(["Yes", "No"]),
+        "irrigation_access": rng.choice(["Yes", "No"]),
+        "dependents": rng.randint(0, 5),
+        "gender": rng.choice(["Male", "Female", "Other"]),
+    }
+
+def send(url, payload):
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as resp:
+        resp.read()
+    return (time.perf_counter() - start) * 1000
+
+def run(base_url, n_requests, concurrency, seed=42):
+    rng = random.Random(seed)
+    payloads = [random_farmer(rng) for _ in range(n_requests)]
+    url = f"{base_url}/predict"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(lambda p: send(url, p), payloads)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "throughput_rps": n_requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the AgriConnect scoring API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    result = run(args.url, args.requests, args.concurrency)
+    print(f"{result['requests']} requests @ concurrency {result['concurrency']}: "
+          f"{result['throughput_rps']:.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+          f"p99 {result['p99_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+
+if __name__ == "__main__":
+    main()
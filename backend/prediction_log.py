@@ -0,0 +1,152 @@
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+
+from backend.scoring import INPUT_FIELDS
+
+DB_PATH = "predictions.db"
+INSERT_COLS = INPUT_FIELDS + ["creditworthy", "probability", "timestamp"]
+
+logger = logging.getLogger(__name__)
+
+def init_db(conn):
+    # Same schema the predictions table already has in predictions.db
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS predictions (
+            id INTEGER NOT NULL,
+            age INTEGER,
+            education_level VARCHAR,
+            farm_size FLOAT,
+            phone_type VARCHAR,
+            financial_access VARCHAR,
+            experience_years INTEGER,
+            extension_access VARCHAR,
+            cooperative_member VARCHAR,
+            irrigation_access VARCHAR,
+            dependents INTEGER,
+            gender VARCHAR,
+            creditworthy INTEGER,
+            probability FLOAT,
+            timestamp DATETIME,
+            PRIMARY KEY (id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_predictions_id ON predictions (id)")
+    conn.commit()
+
+class PredictionLogger:
+    # Write-behind logger for the predictions table. Requests only append to an in-memory
+    # buffer; a background thread flushes it with executemany every flush_rows rows or
+    # flush_interval_ms, whichever comes first. The buffer is bounded: when it is full the
+    # oldest rows are dropped and counted rather than blocking the request path.
+
+    def __init__(self, db_path=DB_PATH, flush_rows=500, flush_interval_ms=200, max_buffer=50000):
+        self.db_path = db_path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.dropped = 0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._hooks = []
+        self._listeners = []
+
+    def add_flush_hook(self, fn):
+        # fn(conn, rows) runs inside each flush transaction, before commit, in its own savepoint
+        self._hooks.append(fn)
+
+    def add_listener(self, fn):
+        # fn(rows) is called from the writer thread after each committed flush
+        self._listeners.append(fn)
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="prediction-logger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Durability flush: drain everything still buffered before returning
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def log(self, record, creditworthy, probability):
+        row = tuple(record[f] for f in INPUT_FIELDS) + (
+            int(creditworthy), float(probability), datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        )
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(row)
+            should_wake = len(self._buffer) >= self.flush_rows
+        if should_wake:
+            self._wakeup.set()
+
+    def _take(self):
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        return rows
+
+    def _flush(self, conn, rows):
+        sql = f"INSERT INTO predictions ({', '.join(INSERT_COLS)}) VALUES ({', '.join('?' * len(INSERT_COLS))})"
+        try:
+            with conn:
+                conn.executemany(sql, rows)
+                for fn in self._hooks:
+                    self._run_hook(conn, fn, rows)
+        except Exception:
+            logger.exception("Failed to write %d predictions", len(rows))
+            with self._lock:
+                self.dropped += len(rows)
+            return
+        self.written += len(rows)
+        for fn in self._listeners:
+            try:
+                fn(rows)
+            except Exception:
+                logger.exception("Prediction flush listener %s failed", getattr(fn, "__qualname__", fn))
+
+    def _run_hook(self, conn, fn, rows):
+        # A failing hook only loses its own writes; the predictions are still committed and the
+        # logger thread keeps running
+        conn.execute("SAVEPOINT flush_hook")
+        try:
+            fn(conn, rows)
+        except Exception:
+            conn.execute("ROLLBACK TO flush_hook")
+            logger.exception("Prediction flush hook %s failed on %d rows", getattr(fn, "__qualname__", fn), len(rows))
+        conn.execute("RELEASE flush_hook")
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        init_db(conn)
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                rows = self._take()
+                if rows:
+                    self._flush(conn, rows)
+                if self._stopping:
+                    rows = self._take()
+                    if rows:
+                        self._flush(conn, rows)
+                    break
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"written": self.written, "buffered": buffered, "dropped": self.dropped}
@@ -0,0 +1,70 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+
+import model_store
+
+MODEL_NAME = "creditworthy"
+FALLBACK_MODEL_PATH = "your_model.joblib"
+
+# Same encodings as train_and_export_model.py
+GENDER_MAP = {'Male': 0, 'Female': 1, 'Other': 2}
+EDU_MAP = {'Primary': 0, 'Secondary': 1, 'Tertiary': 2}
+PHONE_MAP = {'Basic phone': 0, 'Feature phone': 1, 'Smartphone': 2}
+FIN_MAP = {'None': 0, 'Limited': 1, 'Some': 2, 'Full': 3}
+YN_MAP = {'No': 0, 'Yes': 1}
+
+# (input field, encoding map or None for numeric) in model feature order
+FEATURE_SPEC = [
+    ('age', None),
+    ('education_level', EDU_MAP),
+    ('farm_size', None),
+    ('phone_type', PHONE_MAP),
+    ('financial_access', FIN_MAP),
+    ('experience_years', None),
+    ('extension_access', YN_MAP),
+    ('cooperative_member', YN_MAP),
+    ('irrigation_access', YN_MAP),
+    ('dependents', None),
+    ('gender', GENDER_MAP),
+]
+INPUT_FIELDS = [name for name, _ in FEATURE_SPEC]
+
+def encode_record(record):
+    # Single-row fast path: dict -> list of floats, no DataFrame construction.
+    # Unknown categories become NaN, matching pandas .map() in training.
+    row = []
+    for name, mapping in FEATURE_SPEC:
+        value = record[name]
+        if mapping is not None:
+            value = mapping.get(value, np.nan)
+        row.append(float(value))
+    return row
+
+class Scorer:
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        classes = list(model.classes_)
+        self._pos = classes.index(1) if 1 in classes else None
+
+    def predict_proba(self, rows):
+        X = np.asarray(rows, dtype=np.float64)
+        with warnings.catch_warnings():
+            # The model was fitted on a DataFrame; plain arrays are expected here
+            warnings.simplefilter("ignore", UserWarning)
+            probs = self.model.predict_proba(X)
+        if self._pos is None:
+            return np.zeros(len(X))
+        return probs[:, self._pos]
+
+def load_scorer():
+    try:
+        model, meta = model_store.load_model(MODEL_NAME)
+        return Scorer(model, meta['version'])
+    except FileNotFoundError:
+        if not os.path.isfile(FALLBACK_MODEL_PATH):
+            raise
+        return Scorer(joblib.load(FALLBACK_MODEL_PATH), os.path.basename(FALLBACK_MODEL_PATH))
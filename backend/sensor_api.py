@@ -0,0 +1,65 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import FastAPI, Response
+from pydantic import BaseModel
+
+import temp_alerts
+import temp_rollups
+from backend.sensor_ingest import SensorWriter, validate_readings
+
+MAX_READINGS_PER_BATCH = 10000
+
+class SensorReading(BaseModel):
+    facility_id: int
+    temperature: float
+    humidity: Optional[float] = None
+    log_time: datetime
+
+class SensorBatch(BaseModel):
+    readings: List[SensorReading]
+
+state = {}
+
+@asynccontextmanager
+async def lifespan(app):
+    writer = SensorWriter()
+    # 5-minute/hourly/daily rollups are updated in the same transaction as the readings
+    writer.add_flush_hook(lambda conn, rows: temp_rollups.refresh(conn))
+    # Alerts are evaluated on every flushed reading and written in the same transaction
+    alerts = temp_alerts.AlertEngine()
+    writer.add_flush_hook(alerts.on_flush)
+    writer.add_listener(alerts.apply)
+    writer.start()
+    state["writer"] = writer
+    state["alerts"] = alerts
+    yield
+    writer.stop()
+    state.clear()
+
+# Separate from the scoring API so ingestion has its own process and event loop:
+#   uvicorn backend.sensor_api:app --port 8001
+app = FastAPI(title="AgriConnect Sensor Ingestion", lifespan=lifespan)
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "ingest": state["writer"].stats(), "alerts": state["alerts"].stats()}
+
+@app.post("/readings", status_code=202)
+async def ingest(batch: SensorBatch, response: Response):
+    # 202: readings are buffered and written to temp_logs by the writer thread shortly after.
+    # Out-of-range readings are rejected individually; the rest of the batch is still accepted.
+    if len(batch.readings) > MAX_READINGS_PER_BATCH:
+        response.status_code = 413
+        return {"detail": f"At most {MAX_READINGS_PER_BATCH} readings per batch"}
+    rows, rejected = validate_readings(
+        (r.facility_id, r.temperature, r.humidity, r.log_time) for r in batch.readings
+    )
+    writer = state["writer"]
+    if rows and not writer.submit(rows):
+        # Backpressure: nothing from this batch was kept, the sensor should resend it later
+        response.status_code = 429
+        response.headers["Retry-After"] = str(writer.retry_after())
+        return {"detail": "Ingestion buffer is full, retry later", "accepted": 0, "rejected": rejected}
+    return {"accepted": len(rows), "rejected": rejected}
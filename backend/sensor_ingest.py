@@ -0,0 +1,215 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import temp_rollups
+
+DB_PATH = "agriconnect_farmers.db"
+INSERT_SQL = "INSERT INTO temp_logs (facility_id, temperature, humidity, log_time) VALUES (?, ?, ?, ?)"
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"   # what add_temp_log writes, so readings sort as text
+TEMPERATURE_RANGE = (-40.0, 80.0)       # °C; anything outside is a broken sensor, not a storage room
+HUMIDITY_RANGE = (0.0, 100.0)
+MAX_CLOCK_SKEW_S = 300                  # readings stamped further in the future than this are rejected
+
+def init_db(conn):
+    # Portal temp_logs schema plus the humidity column sensors report (see sensor_stream.ensure_schema)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS temp_logs (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            facility_id INTEGER,
+            temperature REAL,
+            log_time TEXT,
+            FOREIGN KEY(facility_id) REFERENCES facilities(facility_id)
+        )
+    """)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(temp_logs)")]
+    if "humidity" not in cols:
+        conn.execute("ALTER TABLE temp_logs ADD COLUMN humidity REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_temp_logs_facility_time ON temp_logs(facility_id, log_time)")
+    conn.commit()
+    # Rollup tables; sensor_api refreshes them inside each flush transaction
+    temp_rollups.install(conn)
+
+def _check(reading, latest):
+    facility_id, temperature, humidity, log_time = reading
+    if facility_id <= 0:
+        return "facility_id must be positive"
+    if not (math.isfinite(temperature) and TEMPERATURE_RANGE[0] <= temperature <= TEMPERATURE_RANGE[1]):
+        return f"temperature must be between {TEMPERATURE_RANGE[0]:g} and {TEMPERATURE_RANGE[1]:g}"
+    if humidity is not None and not (math.isfinite(humidity) and HUMIDITY_RANGE[0] <= humidity <= HUMIDITY_RANGE[1]):
+        return f"humidity must be between {HUMIDITY_RANGE[0]:g} and {HUMIDITY_RANGE[1]:g}"
+    if log_time > latest:
+        return "log_time is in the future"
+    return None
+
+def validate_readings(readings):
+    # readings: (facility_id, temperature, humidity, log_time datetime) tuples.
+    # Returns (rows ready for INSERT_SQL, [{"index", "error"}] for the readings that were rejected)
+    latest = datetime.fromtimestamp(time.time() + MAX_CLOCK_SKEW_S)
+    rows, rejected = [], []
+    for i, reading in enumerate(readings):
+        log_time = reading[3]
+        if log_time.tzinfo is not None:
+            # Stored as local wall-clock time, like the portal's manual entries
+            log_time = log_time.astimezone().replace(tzinfo=None)
+        error = _check((reading[0], reading[1], reading[2], log_time), latest)
+        if error:
+            rejected.append({"index": i, "error": error})
+        else:
+            rows.append((reading[0], reading[1], reading[2], log_time.strftime(LOG_TIME_FORMAT)))
+    return rows, rejected
+
+class SensorWriter:
+    # Write-behind buffer for temp_logs, like PredictionLogger, but sensor readings are never
+    # dropped: when the buffer is full, submit() refuses the whole batch and the caller tells the
+    # sensor to retry later (HTTP 429). A background thread flushes with one executemany per
+    # transaction every flush_rows rows or flush_interval_ms, whichever comes first.
+
+    def __init__(self, db_path=DB_PATH, flush_rows=20000, flush_interval_ms=250, max_buffer=500000):
+        self.db_path = db_path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffer = max_buffer
+        self.accepted = 0
+        self.written = 0
+        self.throttled = 0
+        self.failed = 0
+        self.hook_errors = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self._busy = 0.0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._hooks = []
+        self._listeners = []
+
+    def add_flush_hook(self, fn):
+        # fn(conn, rows) runs inside each flush transaction, before commit. A hook that raises has
+        # its own writes rolled back; the readings and the other hooks' writes are still committed.
+        self._hooks.append(fn)
+
+    def add_listener(self, fn):
+        # fn(rows) is called from the writer thread after each committed flush
+        self._listeners.append(fn)
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="sensor-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Durability flush: drain everything still buffered before returning
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, rows):
+        # All or nothing, so a refused batch can simply be resent
+        with self._lock:
+            if len(self._buffer) + len(rows) > self.max_buffer:
+                self.throttled += len(rows)
+                return False
+            self._buffer.extend(rows)
+            self.accepted += len(rows)
+            should_wake = len(self._buffer) >= self.flush_rows
+        if should_wake:
+            self._wakeup.set()
+        return True
+
+    def retry_after(self):
+        # Seconds until roughly half the buffer has been written at the last measured flush rate
+        rate = self.written / max(self._busy, 1e-9) if self.written else self.flush_rows / max(self.flush_interval, 1e-3)
+        with self._lock:
+            buffered = len(self._buffer)
+        return max(1, math.ceil(buffered / 2 / rate))
+
+    def _take(self):
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        return rows
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._buffer.extendleft(reversed(rows))
+
+    def _flush(self, conn, rows):
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, rows)
+                for fn in self._hooks:
+                    self._run_hook(conn, fn, rows)
+        except sqlite3.OperationalError as e:
+            if self._stopping:
+                print(f"Failed to write {len(rows)} sensor readings at shutdown: {e}")
+                self.failed += len(rows)
+            else:
+                # Usually "database is locked" by another writer; keep the rows and retry next flush
+                print(f"Sensor flush of {len(rows)} readings deferred: {e}")
+                self._requeue(rows)
+            return False
+        except Exception as e:
+            print(f"Failed to write {len(rows)} sensor readings: {e}")
+            self.failed += len(rows)
+            return False
+        elapsed = time.perf_counter() - start
+        self._busy += elapsed
+        self.last_flush_ms = elapsed * 1000
+        self.written += len(rows)
+        self.flushes += 1
+        for fn in self._listeners:
+            try:
+                fn(rows)
+            except Exception as e:
+                print(f"Sensor flush listener {getattr(fn, '__qualname__', fn)} failed: {e}")
+                self.hook_errors += 1
+        return True
+
+    def _run_hook(self, conn, fn, rows):
+        # Derived data (rollups, alerts) must never cost the readings themselves, nor the writer thread
+        conn.execute("SAVEPOINT flush_hook")
+        try:
+            fn(conn, rows)
+        except Exception as e:
+            conn.execute("ROLLBACK TO flush_hook")
+            print(f"Sensor flush hook {getattr(fn, '__qualname__', fn)} failed on {len(rows)} readings: {e}")
+            self.hook_errors += 1
+        conn.execute("RELEASE flush_hook")
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")   # no fsync per commit; a power cut can lose the last flushes, never corrupt the db
+        init_db(conn)
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                rows = self._take()
+                if rows and not self._flush(conn, rows):
+                    time.sleep(self.flush_interval)
+                if self._stopping:
+                    rows = self._take()
+                    if rows:
+                        self._flush(conn, rows)
+                    break
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "accepted": self.accepted, "written": self.written, "buffered": buffered,
+            "throttled": self.throttled, "failed": self.failed, "hook_errors": self.hook_errors,
+            "flushes": self.flushes, "last_flush_ms": round(self.last_flush_ms, 1),
+        }
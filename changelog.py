@@ -0,0 +1,183 @@
+import argparse
+import sqlite3
+import time
+
+# Change-data-capture for SQLite: AFTER INSERT/UPDATE/DELETE triggers append (version, table, pk, op)
+# rows to a changelog table in the same database, inside the writer's transaction. Downstream
+# components read changes since their own cursor and update derived data incrementally.
+#
+# ops: I insert, U update, D delete, R reload (the whole table was replaced; rebuild from scratch)
+
+MAIN_DB = "agriconnect.db"
+PORTAL_DB = "agriconnect_farmers.db"
+CHANGELOG_TABLE = "changelog"
+CURSOR_TABLE = "changelog_cursors"
+TRACKED = {
+    MAIN_DB: ["farmers"],
+    PORTAL_DB: ["users", "facilities", "crops", "temp_logs"],
+}
+
+def init_tables(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHANGELOG_TABLE} (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            pk TEXT,
+            op TEXT NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CURSOR_TABLE} (
+            consumer TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TEXT
+        )
+    """)
+
+def primary_key(conn, table):
+    # farmers is keyed by farmer_id when it has one; otherwise the declared PK, else rowid
+    cols = list(conn.execute(f"PRAGMA table_info({table})"))
+    names = [c[1] for c in cols]
+    if not names:
+        raise ValueError(f"Table '{table}' does not exist")
+    if "farmer_id" in names:
+        return "farmer_id"
+    pks = [c[1] for c in cols if c[5]]
+    return pks[0] if len(pks) == 1 else "rowid"
+
+def trigger_sql(table, pk):
+    log = f"INSERT INTO {CHANGELOG_TABLE} (table_name, pk, op)"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS cdc_{table}_insert AFTER INSERT ON {table} BEGIN "
+        f"{log} VALUES ('{table}', NEW.{pk}, 'I'); END",
+        # A key change is logged as a delete of the old key plus an update of the new one
+        f"CREATE TRIGGER IF NOT EXISTS cdc_{table}_update AFTER UPDATE ON {table} BEGIN "
+        f"{log} SELECT '{table}', OLD.{pk}, 'D' WHERE OLD.{pk} IS NOT NEW.{pk}; "
+        f"{log} VALUES ('{table}', NEW.{pk}, 'U'); END",
+        f"CREATE TRIGGER IF NOT EXISTS cdc_{table}_delete AFTER DELETE ON {table} BEGIN "
+        f"{log} VALUES ('{table}', OLD.{pk}, 'D'); END",
+    ]
+
+def install(db_path, tables):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            init_tables(conn)
+            for table in tables:
+                for sql in trigger_sql(table, primary_key(conn, table)):
+                    conn.execute(sql)
+    finally:
+        conn.close()
+    print(f"Change log triggers installed on {', '.join(tables)} in {db_path}.")
+
+def is_installed(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (CHANGELOG_TABLE,)
+    ).fetchone() is not None
+
+def mark_reload(conn, table):
+    # For bulk replacements that bypass the triggers (e.g. csv_to_sqlite's table swap)
+    if is_installed(conn):
+        conn.execute(f"INSERT INTO {CHANGELOG_TABLE} (table_name, pk, op) VALUES (?, NULL, 'R')", (table,))
+
+def log_diff(conn, table, old, new, pk, cols):
+    # For bulk replacements that bypass the triggers: logs I/U/D per key by comparing the old table
+    # with its replacement on cols, inside the caller's transaction. Returns the number of entries.
+    if not is_installed(conn):
+        return 0
+    log = f"INSERT INTO {CHANGELOG_TABLE} (table_name, pk, op)"
+    changed = " OR ".join(f"n.{c} IS NOT o.{c}" for c in cols if c != pk) or "0"
+    logged = conn.execute(
+        f"{log} SELECT '{table}', n.{pk}, CASE WHEN o.{pk} IS NULL THEN 'I' ELSE 'U' END "
+        f"FROM {new} n LEFT JOIN {old} o ON o.{pk} = n.{pk} "
+        f"WHERE n.{pk} IS NOT NULL AND (o.{pk} IS NULL OR {changed})"
+    ).rowcount
+    logged += conn.execute(
+        f"{log} SELECT '{table}', o.{pk}, 'D' FROM {old} o "
+        f"WHERE o.{pk} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {new} n WHERE n.{pk} = o.{pk})"
+    ).rowcount
+    return logged
+
+def compact(conn):
+    # Drops entries every registered consumer has already read
+    row = conn.execute(f"SELECT MIN(version) FROM {CURSOR_TABLE}").fetchone()
+    if row[0] is None:
+        return 0
+    with conn:
+        return conn.execute(f"DELETE FROM {CHANGELOG_TABLE} WHERE version <= ?", (row[0],)).rowcount
+
+class ChangeConsumer:
+    # Reads changes after its stored cursor; call commit(version) once they have been applied.
+    # Delivery is at-least-once: changes read but not committed are returned again next time.
+
+    def __init__(self, name, db_path=MAIN_DB, tables=None):
+        self.name = name
+        self.tables = tables
+        self.conn = sqlite3.connect(db_path)
+        with self.conn:
+            init_tables(self.conn)
+            self.conn.execute(
+                f"INSERT OR IGNORE INTO {CURSOR_TABLE} (consumer, version, updated_at) VALUES (?, 0, ?)",
+                (name, time.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    @property
+    def cursor(self):
+        return self.conn.execute(f"SELECT version FROM {CURSOR_TABLE} WHERE consumer=?", (self.name,)).fetchone()[0]
+
+    def poll(self, limit=10000, coalesce=True):
+        # Returns (changes, last_version). changes is a list of (version, table_name, pk, op);
+        # with coalesce, only the latest change per (table, pk) in the batch is kept, and anything
+        # before a reload of a table is dropped.
+        sql = f"SELECT version, table_name, pk, op FROM {CHANGELOG_TABLE} WHERE version > ?"
+        params = [self.cursor]
+        if self.tables:
+            sql += f" AND table_name IN ({', '.join('?' * len(self.tables))})"
+            params += list(self.tables)
+        rows = self.conn.execute(sql + " ORDER BY version LIMIT ?", params + [limit]).fetchall()
+        if not rows:
+            return [], params[0]
+        last_version = rows[-1][0]
+        if coalesce:
+            latest, reloaded = {}, {}
+            for row in rows:
+                if row[3] == "R":
+                    reloaded[row[1]] = row[0]
+                latest[(row[1], row[2])] = row
+            rows = sorted(
+                (r for r in latest.values() if r[3] == "R" or r[0] > reloaded.get(r[1], 0)),
+                key=lambda r: r[0]
+            )
+        return rows, last_version
+
+    def commit(self, version):
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE {CURSOR_TABLE} SET version=MAX(version, ?), updated_at=? WHERE consumer=?",
+                (version, time.strftime("%Y-%m-%d %H:%M:%S"), self.name)
+            )
+
+    def close(self):
+        self.conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Install change log triggers or read changes as a consumer")
+    parser.add_argument("command", choices=["install", "tail", "compact"])
+    parser.add_argument("--db", default=None, help="Only this database (default: agriconnect.db and the portal db)")
+    parser.add_argument("--consumer", default="cli")
+    args = parser.parse_args()
+    dbs = {args.db: TRACKED.get(args.db, [])} if args.db else TRACKED
+    for db_path, tables in dbs.items():
+        if args.command == "install":
+            install(db_path, tables)
+        elif args.command == "compact":
+            conn = sqlite3.connect(db_path)
+            print(f"{db_path}: removed {compact(conn)} consumed changelog entries.")
+            conn.close()
+        else:
+            consumer = ChangeConsumer(args.consumer, db_path)
+            changes, version = consumer.poll()
+            for change in changes:
+                print(db_path, *change)
+            consumer.commit(version)
+            consumer.close()
@@ -1,57 +1,185 @@
+import argparse
+import csv
+import json
 import os
+import sys
+import time
+
+import numpy as np
 import pandas as pd
 
+import farmer_keys
+
 REQUIRED_COLS = ['region', 'phl_risk_score', 'predicted_credit_score', 'interventions_adopted']
 FILENAME = "integrated_results.csv"
+REPORT_FILE = "integrated_results.check.json"
+CHUNK_SIZE = 100000
+
+sources = {
+    "credit": "synthetic_loan_repayment_large.csv",
+    "phl": "phl_risk_results_large.csv"
+}
+# Expected type and range per column; columns other than REQUIRED_COLS are checked only if present
+COLUMN_RULES = {
+    'farmer_id': {'type': 'str', 'nullable': False},
+    'region': {'type': 'any', 'nullable': False},
+    'predicted_credit_score': {'type': 'float', 'min': 0.0, 'max': 1.0, 'nullable': False},
+    'phl_risk_score': {'type': 'float', 'min': 0.0, 'max': 1.0, 'nullable': False},
+    'avg_annual_phl_loss': {'type': 'float', 'min': 0.0, 'max': 1.0, 'nullable': True},
+    'interventions_adopted': {'type': 'int', 'min': 0, 'max': 10, 'nullable': False},
+    'farm_size': {'type': 'float', 'min': 0.0, 'nullable': True},
+    'age': {'type': 'int', 'min': 0, 'max': 120, 'nullable': True},
+    'prev_loan': {'type': 'int', 'min': 0, 'max': 1, 'nullable': True},
+}
+# Where missing columns are repaired from, and the fallback when a farmer has no source row.
+# predicted_credit_score has no source: re-run phl_credit_pipeline.py to get real scores.
+REPAIR_SOURCES = {
+    'region': ("credit", 'Unknown'),
+    'phl_risk_score': ("phl", 0),
+    'interventions_adopted': ("phl", 0),
+    'predicted_credit_score': (None, 0.5),
+}
+
+def read_header(path):
+    with open(path, newline='') as f:
+        return next(csv.reader(f), [])
+
+def check_column(series, rule, seen=None):
+    # seen: values of a 'str' column in earlier chunks, updated in place, so duplicates are
+    # counted across the whole file
+    issues = {'nulls': int(series.isna().sum())}
+    if rule['type'] in ('float', 'int'):
+        values = pd.to_numeric(series, errors='coerce')
+        issues['non_numeric'] = int((values.isna() & series.notna()).sum())
+        if rule['type'] == 'int':
+            issues['non_integer'] = int((values.notna() & (values % 1 != 0)).sum())
+        out = np.zeros(len(values), dtype=bool)
+        if 'min' in rule:
+            out |= (values < rule['min']).to_numpy()
+        if 'max' in rule:
+            out |= (values > rule['max']).to_numpy()
+        issues['out_of_range'] = int(out.sum())
+    if rule['type'] == 'str':
+        values = series.dropna()
+        dup = values.duplicated().to_numpy()
+        if seen is not None:
+            dup = dup | np.fromiter((v in seen for v in values), dtype=bool, count=len(values))
+            seen.update(values)
+        issues['duplicates'] = int(dup.sum())
+    return issues
+
+def validate(path=FILENAME, chunk_size=CHUNK_SIZE):
+    # Header check, then every row streamed chunk by chunk; never loads the whole file
+    report = {'file': path, 'checked_at': time.strftime("%Y-%m-%d %H:%M:%S"), 'ok': False}
+    if not os.path.isfile(path):
+        report['errors'] = [f"{path} not found"]
+        return report
+    header = read_header(path)
+    checked = [c for c in COLUMN_RULES if c in header]
+    report['columns_present'] = header
+    report['missing_columns'] = [c for c in REQUIRED_COLS if c not in header]
+    totals = {c: {} for c in checked}
+    seen = {c: set() for c in checked if COLUMN_RULES[c]['type'] == 'str'}
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=checked, dtype=str):
+        rows += len(chunk)
+        for c in checked:
+            for kind, count in check_column(chunk[c], COLUMN_RULES[c], seen.get(c)).items():
+                totals[c][kind] = totals[c].get(kind, 0) + count
+    report['rows_checked'] = rows
+    report['columns'] = totals
+    errors = [f"missing column {c}" for c in report['missing_columns']]
+    for col, issues in report['columns'].items():
+        for kind, count in issues.items():
+            if count and not (kind == 'nulls' and COLUMN_RULES[col]['nullable']):
+                errors.append(f"{col}: {count} {kind.replace('_', ' ')}")
+    report['errors'] = errors
+    report['ok'] = not errors
+    return report
+
+def write_report(report, path=REPORT_FILE):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def _source_lookup(name, columns):
+    # Only the key and the columns being repaired are read from each source. The registry's keys
+    # are the lookup's row numbers, so each chunk is joined by one hash lookup plus array indexing.
+    path = sources[name]
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"{path} is needed to repair {columns} but was not found")
+    lookup = pd.read_csv(path, usecols=['farmer_id'] + columns).drop_duplicates('farmer_id').reset_index(drop=True)
+    registry = farmer_keys.FarmerRegistry(lookup['farmer_id'])
+    return registry, lookup.drop(columns='farmer_id').assign(**{farmer_keys.KEY_COL: np.arange(len(lookup))})
+
+def repair_chunk(chunk, lookups):
+    for registry, lookup in lookups:
+        keyed = chunk.assign(**{farmer_keys.KEY_COL: registry.encode(chunk['farmer_id'], add=False)})
+        chunk = farmer_keys.join_on_key(keyed, lookup).drop(columns=farmer_keys.KEY_COL)
+    for col, (_, default) in REPAIR_SOURCES.items():
+        if col not in chunk.columns:
+            chunk[col] = default
+        chunk[col] = chunk[col].fillna(default)
+    for col, rule in COLUMN_RULES.items():
+        if col not in chunk.columns or rule['type'] not in ('float', 'int'):
+            continue
+        values = pd.to_numeric(chunk[col], errors='coerce').clip(rule.get('min'), rule.get('max'))
+        if rule['type'] == 'int':
+            values = values.round()
+        if not rule['nullable']:
+            fallback = REPAIR_SOURCES.get(col, (None, rule.get('min', 0)))[1]
+            values = values.fillna(fallback)
+        chunk[col] = values.astype('Int64') if rule['type'] == 'int' else values
+    return chunk
+
+def repair(path=FILENAME, chunk_size=CHUNK_SIZE):
+    # Streams the file (or the credit source, if the file has no farmer_id) chunk by chunk into a
+    # temporary file and swaps it in; only missing columns are looked up from the sources
+    header = read_header(path) if os.path.isfile(path) else []
+    base = path if 'farmer_id' in header else sources["credit"]
+    base_header = header if base == path else read_header(base)
+    missing = [c for c in REPAIR_SOURCES if c not in base_header]
+    by_source = {}
+    for col in missing:
+        src = REPAIR_SOURCES[col][0]
+        if src is not None:
+            by_source.setdefault(src, []).append(col)
+    lookups = [_source_lookup(src, cols) for src, cols in by_source.items()]
+
+    tmp = f"{path}.tmp"
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(base, chunksize=chunk_size)):
+        fixed = repair_chunk(chunk, lookups)
+        fixed.to_csv(tmp, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(fixed)
+    os.replace(tmp, path)
+    return {'source': base, 'rows_written': rows, 'columns_added': missing}
 
-def check_and_fix_csv():
-    # Step 1: Check for file existence
-    if not os.path.isfile(FILENAME):
-        print(f"ERROR: {FILENAME} not found in this folder.")
-        print("If you have 'phl_credit_pipeline.py', run it to generate the file.")
-        return
-
-    df = pd.read_csv(FILENAME)
-    print(f"Loaded {FILENAME} - shape: {df.shape}")
-    print("Columns:", df.columns.tolist())
-    missing = [col for col in REQUIRED_COLS if col not in df.columns]
-    if not missing:
-        print("✅ All required columns are present! No fix needed.")
-        print(df.head())
-        return
-
-    print(f"Missing columns: {missing}")
-
-    # Step 2: Try to reconstruct from sources if available
-    sources = {
-        "credit": "synthetic_loan_repayment_large.csv",
-        "phl": "phl_risk_results_large.csv"
-    }
-    if not (os.path.isfile(sources["credit"]) and os.path.isfile(sources["phl"])):
-        print("Could not find one or both of the source CSVs to auto-fix. Please re-run your pipeline or add the columns manually.")
-        return
-
-    credit = pd.read_csv(sources["credit"])
-    phl = pd.read_csv(sources["phl"])
-
-    # Merge on farmer_id (assumed key)
-    merged = pd.merge(credit, phl, on='farmer_id', how='left')
-
-    # Fill missing PHL columns
-    if 'phl_risk_score' in missing:
-        merged['phl_risk_score'] = merged.get('phl_risk_score', pd.Series([0]*len(merged)))
-    if 'interventions_adopted' in missing:
-        merged['interventions_adopted'] = merged.get('interventions_adopted', pd.Series([0]*len(merged)))
-    if 'predicted_credit_score' in missing:
-        # If you have a model, you should re-run your pipeline to get this. Here, we fill with 0.5 as placeholder.
-        merged['predicted_credit_score'] = merged.get('predicted_credit_score', pd.Series([0.5]*len(merged)))
-    if 'region' in missing:
-        merged['region'] = merged.get('region', pd.Series(['Unknown']*len(merged)))
-
-    # Save fixed file
-    merged.to_csv(FILENAME, index=False)
-    print(f"✅ Fixed {FILENAME} with columns: {merged.columns.tolist()}")
-    print(merged[REQUIRED_COLS + ['farmer_id']].head())
+def check_and_fix_csv(fix=True, chunk_size=CHUNK_SIZE, report_path=REPORT_FILE):
+    start = time.time()
+    report = validate(FILENAME, chunk_size)
+    if not report['ok'] and fix:
+        print(f"Problems found in {FILENAME}: {report['errors']}")
+        try:
+            report['repair'] = repair(FILENAME, chunk_size)
+        except FileNotFoundError as e:
+            report['repair'] = {'error': str(e)}
+            print(f"Could not auto-fix: {e}. Please re-run your pipeline or add the columns manually.")
+        else:
+            before = report['errors']
+            report = {**validate(FILENAME, chunk_size), 'repair': report['repair'], 'errors_before_repair': before}
+    report['seconds'] = round(time.time() - start, 3)
+    write_report(report, report_path)
+    if report['ok']:
+        print(f"✅ {FILENAME} passed validation ({report['rows_checked']:,} rows checked). Report: {report_path}")
+    else:
+        print(f"❌ {FILENAME} failed validation: {report['errors']}. Report: {report_path}")
+    return report
 
 if __name__ == "__main__":
-    check_and_fix_csv()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Validate integrated_results.csv and repair it if needed")
+    parser.add_argument("--check-only", action="store_true", help="Validate and report without repairing")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--report", default=REPORT_FILE)
+    args = parser.parse_args()
+    result = check_and_fix_csv(not args.check_only, args.chunk_size, args.report)
+    sys.exit(0 if result['ok'] else 1)
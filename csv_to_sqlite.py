@@ -1,21 +1,147 @@
-import pandas as pd
+import argparse
 import sqlite3
+import time
+
+import pandas as pd
+
+import changelog
 
 # Change these filenames as needed
 csv_file = "integrated_results.csv"
 sqlite_db = "agriconnect.db"
 table_name = "farmers"
+CHUNK_SIZE = 100000
+
+# Explicit schema for integrated_results.csv (categoricals are the pipeline's integer codes)
+SCHEMA = {
+    'farmer_id': 'TEXT PRIMARY KEY',
+    'region': 'INTEGER',
+    'crop_type': 'INTEGER',
+    'age': 'INTEGER',
+    'education': 'INTEGER',
+    'farm_size': 'REAL',
+    'tech_literacy': 'INTEGER',
+    'financial_access': 'INTEGER',
+    'prev_loan': 'INTEGER',
+    'predicted_credit_score': 'REAL',
+    'phl_risk_score': 'REAL',
+    'avg_annual_phl_loss': 'REAL',
+    'interventions_adopted': 'INTEGER',
+}
+DTYPES = {
+    'TEXT PRIMARY KEY': 'string',
+    'INTEGER': 'Int64',
+    'REAL': 'float64',
+}
+# Built after the load; indexes and triggers defined on the old table are carried over as well
+# (change log triggers are recreated for the new key)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_{table}_region ON {table}(region)",
+    "CREATE INDEX IF NOT EXISTS ix_{table}_credit ON {table}(predicted_credit_score)",
+]
+# Per-farmer caches over the farmers table (incremental_scoring's feature hashes): every row may
+# have been rewritten by the swap, so they are emptied in the same transaction
+DERIVED_STATE_TABLES = ["scoring_state"]
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def _rows(chunk):
+    # NaN / <NA> become NULL, numpy scalars become Python values
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
 
-# Load the CSV into a DataFrame
-df = pd.read_csv(csv_file)
+def load_csv(csv_path=csv_file, db_path=sqlite_db, table=table_name, chunk_size=CHUNK_SIZE, replace=False):
+    # Streams the CSV into a staging table and swaps it in, all in one transaction: readers keep
+    # seeing the old table until COMMIT, and a failed load leaves it untouched.
+    # Without replace, farmers already in the table and absent from the CSV are kept (upsert by farmer_id).
+    start = time.time()
+    staging = f"{table}__staging"
+    cols = list(SCHEMA)
+    upsert = (
+        f"INSERT INTO {staging} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+        f"ON CONFLICT(farmer_id) DO UPDATE SET " + ", ".join(f"{c}=excluded.{c}" for c in cols[1:])
+    )
+    conn = sqlite3.connect(db_path, isolation_level=None)  # explicit BEGIN/COMMIT below
+    # WAL: a load that spills the page cache never takes the exclusive lock, so readers keep going
+    conn.execute("PRAGMA journal_mode=WAL")
+    rows = 0
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        old_cols = _columns(conn, table)
+        definitions = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name=? AND sql IS NOT NULL",
+            (table,)
+        ).fetchall()
+        # Change log triggers are regenerated for the new table's key rather than copied
+        cdc = any(name.startswith(f"cdc_{table}_") for name, _ in definitions)
+        carried = [sql for name, sql in definitions if not name.startswith(f"cdc_{table}_")]
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.execute(f"CREATE TABLE {staging} (" + ", ".join(f"{c} {t}" for c, t in SCHEMA.items()) + ")")
+        if not replace and 'farmer_id' in old_cols:
+            keep = [c for c in cols if c in old_cols]
+            conn.execute(
+                f"INSERT OR REPLACE INTO {staging} ({', '.join(keep)}) SELECT {', '.join(keep)} FROM {table} "
+                "WHERE farmer_id IS NOT NULL"
+            )
 
-# Connect to SQLite (it will create the DB file if it doesn't exist)
-conn = sqlite3.connect(sqlite_db)
+        header = pd.read_csv(csv_path, nrows=0).columns
+        missing = [c for c in cols if c not in header]
+        if 'farmer_id' in missing:
+            raise ValueError(f"{csv_path} has no farmer_id column")
+        reader = pd.read_csv(
+            csv_path, chunksize=chunk_size, usecols=lambda c: c in SCHEMA,
+            dtype={c: DTYPES[t] for c, t in SCHEMA.items() if c in header}
+        )
+        for chunk in reader:
+            chunk = chunk.reindex(columns=cols)
+            conn.executemany(upsert, _rows(chunk))
+            rows += len(chunk)
 
-# Write the DataFrame to SQLite, replacing the table if it exists
-df.to_sql(table_name, conn, if_exists="replace", index=False)
+        # The swap bypasses the change log triggers: log what changed per farmer, or a reload when
+        # the old table can't be compared row for row (replace, or a table not keyed by farmer_id)
+        if replace or not all(c in old_cols for c in cols):
+            changelog.mark_reload(conn, table)
+        else:
+            changelog.log_diff(conn, table, table, staging, 'farmer_id', cols)
 
-# Optionally: Show success message and number of rows
-print(f"CSV '{csv_file}' loaded into '{sqlite_db}' as table '{table_name}' ({len(df)} rows).")
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        for sql in INDEXES:
+            conn.execute(sql.format(table=table))
+        if cdc:
+            for sql in changelog.trigger_sql(table, changelog.primary_key(conn, table)):
+                conn.execute(sql)
+        for sql in carried:
+            try:
+                conn.execute(sql.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1)
+                                .replace("CREATE UNIQUE INDEX ", "CREATE UNIQUE INDEX IF NOT EXISTS ", 1)
+                                .replace("CREATE TRIGGER ", "CREATE TRIGGER IF NOT EXISTS ", 1))
+            except sqlite3.OperationalError as e:
+                # The old table had a different schema; skip definitions that no longer apply
+                print(f"Skipped carrying over: {sql.splitlines()[0]} ({e})")
+        for state in DERIVED_STATE_TABLES:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (state,)).fetchone():
+                conn.execute(f"DELETE FROM {state}")
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    if missing:
+        print(f"Columns missing from the CSV were loaded as NULL: {missing}")
+    print(f"CSV '{csv_path}' loaded into '{db_path}' as table '{table}' "
+          f"({rows} rows upserted, {total} total) in {time.time() - start:.2f}s.")
+    return rows
 
-conn.close()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load integrated_results.csv into SQLite with an atomic table swap")
+    parser.add_argument("--csv", default=csv_file)
+    parser.add_argument("--db", default=sqlite_db)
+    parser.add_argument("--table", default=table_name)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--replace", action="store_true", help="Drop farmers that are not in the CSV")
+    args = parser.parse_args()
+    load_csv(args.csv, args.db, args.table, args.chunk_size, args.replace)
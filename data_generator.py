@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 import random
+import sqlite3
+import time
+import argparse
 
 regions = ['Kano', 'Oyo', 'Benue', 'Kaduna', 'Plateau']
 crop_types = ['Maize', 'Rice', 'Tomatoes', 'Yam', 'Cassava']
@@ -42,16 +45,97 @@ def generate_farmer_row(i):
         dependents, gender, round(lat, 4), round(long, 4)
     ]
 
-def main(n=100):
-    rows = [generate_farmer_row(i) for i in range(1, n+1)]
-    columns = [
-        'farmer_id','region','crop_type','age','education_level','farm_size','phone_type',
-        'financial_access','experience_years','extension_access','cooperative_member',
-        'irrigation_access','dependents','gender','latitude','longitude'
-    ]
-    df = pd.DataFrame(rows, columns=columns)
-    df.to_csv("youth_farmers.csv", index=False)
-    print(f"Generated youth_farmers.csv with {n} rows.")
+COLUMNS = [
+    'farmer_id','region','crop_type','age','education_level','farm_size','phone_type',
+    'financial_access','experience_years','extension_access','cooperative_member',
+    'irrigation_access','dependents','gender','latitude','longitude'
+]
+REGION_COORDS = np.array([
+    (12.0, 8.5),   # Kano
+    (7.5, 3.9),    # Oyo
+    (7.7, 8.6),    # Benue
+    (10.5, 7.4),   # Kaduna
+    (9.2, 8.9),    # Plateau
+])
+YES_NO = np.array(['Yes', 'No'])
+CHUNK_SIZE = 500_000
+
+def generate_farmers_chunk(rng, start_id, n):
+    # Vectorized equivalent of generate_farmer_row for n farmers with ids start_id..start_id+n-1
+    region_idx = rng.integers(0, len(regions), n)
+    age = rng.integers(18, 36, n)
+    coords = REGION_COORDS[region_idx] + rng.uniform(-0.5, 0.5, (n, 2))
+    ids = pd.Series(np.arange(start_id, start_id + n)).astype(str).str.zfill(3)
+    return pd.DataFrame({
+        'farmer_id': "YF" + ids,
+        'region': pd.Categorical.from_codes(region_idx, regions),
+        'crop_type': pd.Categorical.from_codes(rng.integers(0, len(crop_types), n), crop_types),
+        'age': age,
+        'education_level': pd.Categorical.from_codes(rng.integers(0, len(education_levels), n), education_levels),
+        'farm_size': np.round(rng.uniform(0.5, 5.0, n), 1),
+        'phone_type': pd.Categorical.from_codes(rng.integers(0, len(phone_types), n), phone_types),
+        'financial_access': pd.Categorical.from_codes(rng.integers(0, len(financial_access_levels), n), financial_access_levels),
+        'experience_years': rng.integers(0, age - 15),
+        'extension_access': YES_NO[rng.integers(0, 2, n)],
+        'cooperative_member': YES_NO[rng.integers(0, 2, n)],
+        'irrigation_access': YES_NO[rng.integers(0, 2, n)],
+        'dependents': rng.integers(0, 6, n),
+        'gender': pd.Categorical.from_codes(rng.integers(0, len(genders), n), genders),
+        'latitude': np.round(coords[:, 0], 4),
+        'longitude': np.round(coords[:, 1], 4),
+    }, columns=COLUMNS)
+
+def iter_farmer_chunks(n, chunk_size=CHUNK_SIZE, seed=42):
+    # Each chunk gets its own child RNG, so output depends only on seed and chunk_size
+    seeds = np.random.SeedSequence(seed).spawn((n + chunk_size - 1) // chunk_size)
+    for i, child in enumerate(seeds):
+        start = i * chunk_size
+        yield generate_farmers_chunk(np.random.default_rng(child), start + 1, min(chunk_size, n - start))
+
+def write_farmers(n, path, fmt="csv", chunk_size=CHUNK_SIZE, seed=42, table="youth_farmers"):
+    # Streams chunks to CSV, Parquet or SQLite so memory stays bounded by chunk_size
+    start = time.time()
+    if fmt == "csv":
+        for i, chunk in enumerate(iter_farmer_chunks(n, chunk_size, seed)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in iter_farmer_chunks(n, chunk_size, seed):
+                tbl = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, tbl.schema)
+                writer.write_table(tbl)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif fmt == "sqlite":
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} ({', '.join(COLUMNS)})")
+            insert = f"INSERT INTO {table} VALUES ({', '.join('?' * len(COLUMNS))})"
+            with conn:
+                for chunk in iter_farmer_chunks(n, chunk_size, seed):
+                    conn.executemany(insert, chunk.astype(object).itertuples(index=False, name=None))
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+    elapsed = time.time() - start
+    print(f"Generated {n:,} farmers into {path} ({fmt}) in {elapsed:.1f}s ({n / max(elapsed, 1e-9):,.0f} rows/s).")
+
+def main(n=100, path="youth_farmers.csv", fmt="csv", chunk_size=CHUNK_SIZE, seed=42):
+    write_farmers(n, path, fmt, chunk_size, seed)
 
 if __name__ == "__main__":
-    main(200)  # Change to desired number of farmers
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic youth farmers")
+    parser.add_argument("--rows", type=int, default=200)  # Change to desired number of farmers
+    parser.add_argument("--out", default="youth_farmers.csv")
+    parser.add_argument("--format", choices=["csv", "parquet", "sqlite"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.rows, args.out, args.format, args.chunk_size, args.seed)
@@ -1,10 +1,23 @@
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, roc_auc_score
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix, precision_recall_fscore_support
+from joblib import Parallel, delayed
 import matplotlib.pyplot as plt
 
+import farmer_keys
+import model_store
+from recommendation_rules import ADVICE_RULES
+
+MODEL_NAME = "farmer_credit"
+MODEL_PARAMS = {"n_estimators": 100, "random_state": 42}
+FEATURES = [
+    'age', 'education_level', 'farm_size', 'yield', 'loss_rate', 'tech_literacy', 'financial_access',
+    'prev_loan', 'experience_years', 'extension_access', 'cooperative_member', 'irrigation_access',
+    'dependents', 'gender'
+]
+
 def load_data():
     farmers = pd.read_csv('youth_farmers.csv')
     crops = pd.read_csv('crop_production.csv')
@@ -17,7 +30,7 @@ def preprocess_data(farmers, crops, losses, loan_repay):
     loss_rate = losses.groupby(['region', 'crop_type'])['loss_rate'].mean().reset_index()
     df = farmers.merge(crop_yield, on=['region', 'crop_type'], how='left')
     df = df.merge(loss_rate, on=['region', 'crop_type'], how='left')
-    df = df.merge(loan_repay[['farmer_id', 'prev_loan', 'repayment_status']], on='farmer_id', how='left')
+    df = farmer_keys.merge_on_farmer_id(df, loan_repay[['farmer_id', 'prev_loan', 'repayment_status']], how='left')
     df['yield'] = df['yield'].fillna(df['yield'].mean())
     df['loss_rate'] = df['loss_rate'].fillna(df['loss_rate'].mean())
     df['education_level'] = df['education_level'].map({'Primary':0, 'Secondary':1, 'Tertiary':2})
@@ -31,15 +44,11 @@ def preprocess_data(farmers, crops, losses, loan_repay):
     return df, crop_yield, loss_rate
 
 def train_model(df):
-    features = [
-        'age', 'education_level', 'farm_size', 'yield', 'loss_rate', 'tech_literacy', 'financial_access',
-        'prev_loan', 'experience_years', 'extension_access', 'cooperative_member', 'irrigation_access',
-        'dependents', 'gender'
-    ]
+    features = FEATURES
     X = df[features]
     y = df['repayment_status']
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model = RandomForestClassifier(**MODEL_PARAMS)
     model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
     report = classification_report(y_test, y_pred)
@@ -47,26 +56,77 @@ def train_model(df):
     importances = pd.Series(model.feature_importances_, index=features)
     return model, features, report, roc_auc, importances
 
+def _evaluate_fold(fold, X_train, y_train, X_test, y_test):
+    # Runs in a worker process; one single-threaded forest per fold avoids oversubscription
+    model = RandomForestClassifier(n_jobs=1, **MODEL_PARAMS)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    precision, recall, f1, _ = precision_recall_fscore_support(y_test, y_pred, average='binary', zero_division=0)
+    roc_auc = None
+    if len(np.unique(y_test)) == 2 and len(model.classes_) == 2:
+        roc_auc = float(roc_auc_score(y_test, model.predict_proba(X_test)[:,1]))
+    return {
+        "fold": fold,
+        "n_train": int(len(y_train)),
+        "n_test": int(len(y_test)),
+        "accuracy": float((y_pred == y_test).mean()),
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1": float(f1),
+        "roc_auc": roc_auc,
+        "confusion_matrix": confusion_matrix(y_test, y_pred, labels=[0, 1]).tolist(),
+    }
+
+def cross_validate_model(df, features=FEATURES, n_splits=5, n_jobs=-1):
+    X = df[features].to_numpy()
+    y = df['repayment_status'].astype(int).to_numpy()
+    # Stratified folds need at least n_splits samples of the minority class
+    n_splits = max(2, min(n_splits, np.bincount(y, minlength=2).min()))
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    folds = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(i, X[train_idx], y[train_idx], X[test_idx], y[test_idx])
+        for i, (train_idx, test_idx) in enumerate(skf.split(X, y))
+    )
+    summary = {}
+    for metric in ["accuracy", "precision", "recall", "f1", "roc_auc"]:
+        values = [f[metric] for f in folds if f[metric] is not None]
+        summary[metric] = {
+            "mean": float(np.mean(values)) if values else None,
+            "std": float(np.std(values)) if values else None,
+        }
+    return {
+        "n_splits": n_splits,
+        "folds": folds,
+        "summary": summary,
+        "confusion_matrix": np.sum([f["confusion_matrix"] for f in folds], axis=0).tolist(),
+    }
+
+def save_evaluation(model, features, cv_results, roc_auc):
+    version = model_store.save_model(model, features, MODEL_NAME, metadata={"params": MODEL_PARAMS})
+    report = {"holdout_roc_auc": float(roc_auc), "cross_validation": cv_results}
+    model_store.save_artifact(MODEL_NAME, version, "evaluation", report)
+    return version
+
+def load_evaluation_report(version=None):
+    # Dashboards read the stored report instead of re-running the evaluation
+    return model_store.load_artifact(MODEL_NAME, "evaluation", version=version)
+
+def advice_params(crop_yield, loss_rate):
+    return {"yield_mean": crop_yield['yield'].mean(), "loss_mean": loss_rate['loss_rate'].mean()}
+
+def advice_flags(df, crop_yield, loss_rate):
+    # All advice rules evaluated as masks over the whole frame; one bit per rule
+    masks, _ = ADVICE_RULES.masks(df, advice_params(crop_yield, loss_rate))
+    return ADVICE_RULES.flags(masks)
+
+def render_advice(flags):
+    # At most 256 distinct flag values: build each string once and broadcast
+    unique_flags, inverse = np.unique(np.asarray(flags, dtype=np.uint8), return_inverse=True)
+    texts = np.array([ADVICE_RULES.render_flags(f) for f in unique_flags], dtype=object)
+    return texts[inverse]
+
 def get_advice(row, crop_yield, loss_rate):
-    advice = []
-    if row['credit_score'] < 60:
-        if row['yield'] < crop_yield['yield'].mean():
-            advice.append("Increase your crop yield (e.g., use improved seeds or practices).")
-        if row['loss_rate'] > loss_rate['loss_rate'].mean():
-            advice.append("Reduce post-harvest losses (improve storage, transport).")
-        if row['financial_access'] < 2:
-            advice.append("Adopt mobile money or join a cooperative for better financial access.")
-        if row['tech_literacy'] < 2:
-            advice.append("Use a smartphone for better access to markets and information.")
-        if row['experience_years'] < 3:
-            advice.append("Seek mentorship or training to gain more experience.")
-        if row['extension_access'] == 0:
-            advice.append("Access extension services for up-to-date farming advice.")
-        if row['cooperative_member'] == 0:
-            advice.append("Join a farmers' cooperative for support and loans.")
-        if row['irrigation_access'] == 0:
-            advice.append("Consider irrigation solutions to boost yields.")
-    return " ".join(advice) if advice else "Keep up the good work!"
+    return ADVICE_RULES.evaluate_one(row, advice_params(crop_yield, loss_rate))
 
 def main():
     farmers, crops, losses, loan_repay = load_data()
@@ -75,6 +135,15 @@ def main():
     print("Classification Report:\n", report)
     print("ROC AUC Score:", roc_auc)
 
+    # Cross-validate in parallel and persist the per-fold report with the model version
+    cv_results = cross_validate_model(df, features)
+    version = save_evaluation(model, features, cv_results, roc_auc)
+    print(f"{cv_results['n_splits']}-fold CV:")
+    for metric, stats in cv_results['summary'].items():
+        if stats['mean'] is not None:
+            print(f"  {metric}: {stats['mean']:.3f} ± {stats['std']:.3f}")
+    print(f"Model version {version} saved with evaluation report to {model_store.MODEL_DIR}/{MODEL_NAME}/{version}/")
+
     # Feature importance plot
     importances = importances.sort_values(ascending=True)
     plt.figure(figsize=(8,5))
@@ -86,9 +155,12 @@ def main():
 
     # Generate credit scores
     df['credit_score'] = (model.predict_proba(df[features])[:,1] * 100).round(1)
-    df['improvement_advice'] = df.apply(lambda row: get_advice(row, crop_yield, loss_rate), axis=1)
+    masks, _ = ADVICE_RULES.masks(df, advice_params(crop_yield, loss_rate))
+    df['advice_flags'] = ADVICE_RULES.flags(masks)
+    print("Advice rule hits:", ADVICE_RULES.hit_counts(masks))
 
-    # Export scorecard
+    # Export scorecard; advice text is rendered from the flags only here
+    df['improvement_advice'] = render_advice(df['advice_flags'])
     df[['farmer_id', 'region', 'crop_type', 'credit_score', 'improvement_advice']].to_csv('farmer_credit_scores.csv', index=False)
     print("Credit scores with advice saved to farmer_credit_scores.csv")
     print(df[['farmer_id', 'region', 'crop_type', 'credit_score', 'improvement_advice']].head(10))
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Dense int32 surrogate keys for external farmer IDs ("YF1000", ...) and joins on those keys.
+# Strings are hashed once, when a table is encoded; every join after that is integer array indexing.
+
+REGISTRY_PATH = "farmer_registry.txt"
+KEY_COL = "farmer_key"
+
+class FarmerRegistry:
+    def __init__(self, ids=()):
+        self._ids = pd.Index(pd.unique(pd.Series(np.asarray(ids, dtype=object), dtype=str)))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def encode(self, ids, add=True):
+        # One factorize over registry + new IDs: existing IDs keep their keys, unknown IDs get the
+        # next free keys in order of first appearance. add=False is a lookup (-1 for unknown IDs)
+        # against the registry's cached hash table.
+        if not add:
+            return self._ids.get_indexer(pd.Series(np.asarray(ids), dtype=str)).astype(np.int32)
+        k = len(self._ids)
+        codes, uniques = pd.factorize(pd.concat(
+            [pd.Series(self._ids, dtype=str), pd.Series(np.asarray(ids), dtype=str)], ignore_index=True
+        ))
+        self._ids = pd.Index(uniques)
+        return codes[k:].astype(np.int32)
+
+    def decode(self, keys):
+        return self._ids.to_numpy()[np.asarray(keys)]
+
+    def save(self, path=REGISTRY_PATH):
+        # Append-only: keys already on disk never change
+        existing = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                existing = sum(1 for _ in f)
+        with open(path, "a") as f:
+            for farmer_id in self._ids[existing:]:
+                f.write(f"{farmer_id}\n")
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls([line.rstrip("\n") for line in f])
+
+def add_keys(df, registry, id_col="farmer_id"):
+    return df.assign(**{KEY_COL: registry.encode(df[id_col])})
+
+def _lookup(left_keys, right_keys):
+    # Row of right for each left key (-1 if absent), or None when right keys are not unique
+    size = max(int(right_keys.max(initial=-1)), int(left_keys.max(initial=-1))) + 1
+    if (right_keys < 0).any() or np.bincount(right_keys, minlength=size).max(initial=0) > 1:
+        return None
+    pos = np.full(size, -1, dtype=np.int64)
+    pos[right_keys] = np.arange(len(right_keys))
+    return np.where(left_keys >= 0, pos[np.clip(left_keys, 0, None)], -1)
+
+def _take_join(left, right, idx, how, suffixes, skip=()):
+    if how == "inner":
+        keep = idx >= 0
+        left, idx = left[keep], idx[keep]
+    overlap = (set(left.columns) & set(right.columns)) - set(skip)
+    allow_fill = bool((idx < 0).any())
+    columns = {(c + suffixes[0] if c in overlap else c): left[c].array for c in left.columns}
+    for col in right.columns:
+        if col not in skip:
+            columns[col + suffixes[1] if col in overlap else col] = right[col].array.take(idx, allow_fill=allow_fill)
+    return pd.DataFrame(columns, copy=False)
+
+def join_on_key(left, right, key=KEY_COL, how="left", suffixes=("_x", "_y")):
+    # Left (or inner) join of right onto left by integer key, keeping left's row order.
+    # With unique right keys it is a direct array lookup: pos[key] -> row of right.
+    # Duplicate right keys fall back to pd.merge, still on integer keys.
+    if how not in ("left", "inner"):
+        raise ValueError(f"join_on_key supports how='left' or 'inner', got {how!r}")
+    idx = _lookup(left[key].to_numpy(), right[key].to_numpy())
+    if idx is None:
+        return pd.merge(left, right, on=key, how=how, suffixes=suffixes)
+    return _take_join(left, right, idx, how, suffixes, skip=(key,))
+
+def merge_on_farmer_id(left, right, how="left", registry=None, id_col="farmer_id", suffixes=("_x", "_y")):
+    # Drop-in for pd.merge(left, right, on=id_col, how=how): both ID columns are factorized in one
+    # pass (or encoded through registry) and joined by array lookup, without copying either frame
+    if how not in ("left", "inner"):
+        raise ValueError(f"merge_on_farmer_id supports how='left' or 'inner', got {how!r}")
+    ids = pd.concat([left[id_col], right[id_col]], ignore_index=True)
+    keys = registry.encode(ids) if registry is not None else pd.factorize(ids)[0]
+    idx = _lookup(keys[:len(left)], keys[len(left):])
+    if idx is None:
+        return pd.merge(left, right, on=id_col, how=how, suffixes=suffixes)
+    return _take_join(left, right, idx, how, suffixes, skip=(id_col,))
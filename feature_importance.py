@@ -0,0 +1,34 @@
+import pandas as pd
+from sklearn.inspection import permutation_importance
+
+import model_store
+
+ARTIFACT = "permutation_importance"
+
+def compute_and_store(model, X, y, name, version, n_repeats=10, n_jobs=-1, force=False):
+    # Importances are fixed for a given model version, so compute them once and reuse
+    if not force:
+        cached = model_store.load_artifact(name, ARTIFACT, version=version)
+        if cached is not None:
+            return cached
+    result = permutation_importance(model, X, y, n_repeats=n_repeats, n_jobs=n_jobs, random_state=42)
+    data = {
+        "features": list(X.columns),
+        "importances_mean": [float(v) for v in result.importances_mean],
+        "importances_std": [float(v) for v in result.importances_std],
+        "n_repeats": n_repeats,
+        "n_samples": int(len(X)),
+    }
+    model_store.save_artifact(name, version, ARTIFACT, data)
+    return data
+
+def load_importances(name, version=None):
+    # Returns a Feature/Importance/Std frame for the active model, or None if not computed yet
+    data = model_store.load_artifact(name, ARTIFACT, version=version)
+    if data is None:
+        return None
+    return pd.DataFrame({
+        "Feature": data["features"],
+        "Importance": data["importances_mean"],
+        "Std": data["importances_std"],
+    })
@@ -0,0 +1,98 @@
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import model_store
+from phl_credit_pipeline import MODEL_NAME, FEATURES, OUTPUT_COLS, load_data, build_features
+
+DB_PATH = "agriconnect.db"
+TABLE_NAME = "farmers"
+STATE_TABLE = "scoring_state"
+BATCH_SIZE = 50000
+
+def feature_hashes(df, features=FEATURES):
+    # One 64-bit hash per row, computed vectorized over the whole frame
+    return pd.util.hash_pandas_object(df[features], index=False).astype('int64')
+
+def init_tables(conn):
+    cols = [c for c in OUTPUT_COLS if c != 'farmer_id']
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} (farmer_id TEXT, "
+        + ", ".join(f"{c} REAL" for c in cols) + ")"
+    )
+    existing = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_NAME})")]
+    if 'farmer_id' not in existing:
+        raise RuntimeError(
+            f"Table '{TABLE_NAME}' has no farmer_id column; load integrated_results.csv with csv_to_sqlite.py first."
+        )
+    # Upserts need a unique key on farmer_id
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{TABLE_NAME}_farmer_id ON {TABLE_NAME}(farmer_id)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            farmer_id TEXT PRIMARY KEY,
+            feature_hash INTEGER,
+            model_version TEXT,
+            scored_at TEXT
+        )
+    """)
+
+def find_changed(df, state, model_version):
+    # Rows are stale if the farmer is new, its features changed, or it was scored by another model
+    merged = df[['farmer_id', 'feature_hash']].merge(state, on='farmer_id', how='left', suffixes=('', '_stored'))
+    mask = (merged['feature_hash'] != merged['feature_hash_stored']) | (merged['model_version'] != model_version)
+    return df[mask.to_numpy()]
+
+def rescore_changed(db_path=DB_PATH, batch_size=BATCH_SIZE):
+    start = time.time()
+    model, meta = model_store.load_model(MODEL_NAME)
+    model_version = meta['version']
+
+    credit_df, phl_df = load_data()
+    df = build_features(credit_df, phl_df)
+    df['feature_hash'] = feature_hashes(df)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        init_tables(conn)
+        state = pd.read_sql_query(f"SELECT farmer_id, feature_hash, model_version FROM {STATE_TABLE}", conn)
+        state = state.rename(columns={'feature_hash': 'feature_hash_stored'})
+        changed = find_changed(df, state, model_version)
+        if changed.empty:
+            print(f"All {len(df)} farmers are up to date with model {model_version}.")
+            return 0
+
+        changed = changed.copy()
+        proba = model.predict_proba(changed[FEATURES])
+        changed['predicted_credit_score'] = proba[:, 1] if model.n_classes_ == 2 else proba[:, 0]
+
+        value_cols = [c for c in OUTPUT_COLS if c != 'farmer_id']
+        # Rows whose values didn't change are left alone, so change log triggers only see real updates
+        upsert_farmers = (
+            f"INSERT INTO {TABLE_NAME} ({', '.join(OUTPUT_COLS)}) VALUES ({', '.join('?' * len(OUTPUT_COLS))}) "
+            f"ON CONFLICT(farmer_id) DO UPDATE SET " + ", ".join(f"{c}=excluded.{c}" for c in value_cols)
+            + " WHERE " + " OR ".join(f"excluded.{c} IS NOT {TABLE_NAME}.{c}" for c in value_cols)
+        )
+        upsert_state = (
+            f"INSERT INTO {STATE_TABLE} (farmer_id, feature_hash, model_version, scored_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(farmer_id) DO UPDATE SET feature_hash=excluded.feature_hash, "
+            "model_version=excluded.model_version, scored_at=excluded.scored_at"
+        )
+        scored_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Single transaction so readers see either the old or the new scores
+        with conn:
+            for i in range(0, len(changed), batch_size):
+                chunk = changed.iloc[i:i + batch_size]
+                conn.executemany(upsert_farmers, chunk[OUTPUT_COLS].itertuples(index=False, name=None))
+                conn.executemany(upsert_state, zip(
+                    chunk['farmer_id'], chunk['feature_hash'].tolist(),
+                    [model_version] * len(chunk), [scored_at] * len(chunk)
+                ))
+    finally:
+        conn.close()
+    print(f"Re-scored {len(changed)} of {len(df)} farmers with model {model_version} in {time.time() - start:.2f}s.")
+    return len(changed)
+
+if __name__ == "__main__":
+    rescore_changed()
@@ -1,11 +1,13 @@
 import pandas as pd
 
+import farmer_keys
+
 # Load credit data and PHL risk outputs
 credit_df = pd.read_csv('synthetic_loan_repayment.csv')
 phl_risk_df = pd.read_csv('phl_risk_results.csv')  # Output from your PHL model
 
 # Merge on farmer_id (or other unique identifier)
-full_df = pd.merge(credit_df, phl_risk_df, on='farmer_id', how='left')
+full_df = farmer_keys.merge_on_farmer_id(credit_df, phl_risk_df, how='left')
 
 # Example: Use PHL risk as extra feature for credit scoring
 from sklearn.ensemble import RandomForestClassifier
@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+# Columnar copy of integrated_results.csv for the dashboards. Written as uncompressed Arrow IPC
+# (Feather v2) so it can be memory-mapped and read column by column without parsing.
+# Codes are dictionary-encoded and counts narrowed on disk only; read_integrated() returns the
+# same dtypes as reading the CSV, so the dashboards show identical values either way.
+
+CSV_PATH = "integrated_results.csv"
+ARROW_PATH = "integrated_results.arrow"
+
+CATEGORICAL_COLS = ['region', 'crop_type', 'education', 'tech_literacy', 'financial_access']
+SMALL_INT_COLS = {'age': 'int16', 'prev_loan': 'int8', 'interventions_adopted': 'int8'}
+
+def to_columnar(df):
+    df = df.copy()
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col, dtype in SMALL_INT_COLS.items():
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype(dtype)
+    return df
+
+def from_columnar(df):
+    # Back to the dtypes pd.read_csv gives for integrated_results.csv
+    for col in CATEGORICAL_COLS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).infer_objects()
+    for col in SMALL_INT_COLS:
+        if col in df.columns and df[col].dtype.kind == 'i':
+            df[col] = df[col].astype('int64')
+    return df
+
+def write_arrow(df, path=ARROW_PATH):
+    # Atomic replace so a dashboard never maps a half-written file
+    tmp = f"{path}.tmp"
+    feather.write_feather(to_columnar(df), tmp, compression='uncompressed')
+    os.replace(tmp, path)
+
+def arrow_is_fresh(arrow_path=ARROW_PATH, csv_path=CSV_PATH):
+    if not os.path.exists(arrow_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(arrow_path) >= os.path.getmtime(csv_path)
+
+def read_integrated(columns=None, arrow_path=ARROW_PATH, csv_path=CSV_PATH):
+    # Memory-mapped read of just the requested columns; falls back to the CSV if the Arrow file
+    # is missing or older than the CSV (e.g. the CSV was repaired by hand)
+    if arrow_is_fresh(arrow_path, csv_path):
+        if columns is not None:
+            # File order, as pd.read_csv(usecols=...) returns them
+            columns = [c for c in ipc.open_file(arrow_path).schema.names if c in columns]
+        return from_columnar(feather.read_table(arrow_path, columns=columns, memory_map=True).to_pandas())
+    return pd.read_csv(csv_path, usecols=(lambda c: c in columns) if columns is not None else None)
+
+if __name__ == "__main__":
+    write_arrow(pd.read_csv(CSV_PATH))
+    print(f"Wrote {ARROW_PATH} from {CSV_PATH}.")
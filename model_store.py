@@ -0,0 +1,88 @@
+import os
+import io
+import json
+import hashlib
+from datetime import datetime
+
+import joblib
+
+# Trained models are stored as models/<name>/<version>/ with the pickled model,
+# its metadata and any precomputed artifacts (evaluation reports, importances, ...).
+# models/<name>/ACTIVE holds the version the dashboards and services should use.
+MODEL_DIR = "models"
+
+_model_cache = {}
+
+def _model_path(name, version=None):
+    if version is None:
+        return os.path.join(MODEL_DIR, name)
+    return os.path.join(MODEL_DIR, name, version)
+
+def _write_atomic(path, data, mode="w"):
+    # Write to a temp file and rename so readers never see a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def save_model(model, features, name, metadata=None, activate=True):
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    payload = buf.getvalue()
+    # Version is a content hash, so re-saving an identical model is a no-op
+    version = hashlib.sha1(payload).hexdigest()[:12]
+    path = _model_path(name, version)
+    os.makedirs(path, exist_ok=True)
+    _write_atomic(os.path.join(path, "model.joblib"), payload, mode="wb")
+    meta = {
+        "name": name,
+        "version": version,
+        "features": list(features),
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    meta.update(metadata or {})
+    _write_atomic(os.path.join(path, "meta.json"), json.dumps(meta, indent=2))
+    if activate:
+        set_active_version(name, version)
+    return version
+
+def set_active_version(name, version):
+    if not os.path.isdir(_model_path(name, version)):
+        raise FileNotFoundError(f"Model {name} has no version {version}")
+    _write_atomic(os.path.join(_model_path(name), "ACTIVE"), version)
+
+def get_active_version(name):
+    path = os.path.join(_model_path(name), "ACTIVE")
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return f.read().strip() or None
+
+def load_model(name, version=None):
+    # Returns (model, meta). Models are immutable per version, so cache them in-process.
+    version = version or get_active_version(name)
+    if version is None:
+        raise FileNotFoundError(f"No active version for model {name}")
+    key = (name, version)
+    if key not in _model_cache:
+        path = _model_path(name, version)
+        model = joblib.load(os.path.join(path, "model.joblib"))
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        _model_cache[key] = (model, meta)
+    return _model_cache[key]
+
+def save_artifact(name, version, artifact, data):
+    path = os.path.join(_model_path(name, version), f"{artifact}.json")
+    _write_atomic(path, json.dumps(data, indent=2))
+    return path
+
+def load_artifact(name, artifact, version=None, default=None):
+    version = version or get_active_version(name)
+    if version is None:
+        return default
+    path = os.path.join(_model_path(name, version), f"{artifact}.json")
+    if not os.path.isfile(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
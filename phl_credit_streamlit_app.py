@@ -1,14 +1,16 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from recommendation_rules import get_recommendation
+import integrated_store
+
 st.set_page_config(page_title="AgriConnect: Farmer Credit & PHL Risk Dashboard", layout="wide")
 
 # Load data
 @st.cache_data
 def load_data():
-    df = pd.read_csv("integrated_results.csv")
+    df = integrated_store.read_integrated(['farmer_id', 'predicted_credit_score', 'phl_risk_score', 'interventions_adopted'])
     return df
 
 df = load_data()
@@ -35,17 +37,6 @@ col2.metric("PHL Risk Score", f"{farmer_row['phl_risk_score']:.2f}",
 col3.metric("Interventions Adopted", int(farmer_row['interventions_adopted']), 
             help="Number of risk-reducing interventions adopted")
 
-# Recommendation logic
-def get_recommendation(credit, risk, interventions):
-    if credit >= 0.7 and risk <= 0.4:
-        return "✅ Eligible for favorable loan. Low PHL risk."
-    elif credit >= 0.7 and risk > 0.4:
-        return "⚠️ Eligible for loan, but PHL risk is high. Adopt more PHL interventions!"
-    elif credit < 0.5:
-        return "❌ Improve repayment record or reduce PHL risk to qualify for credit."
-    else:
-        return "Consider adopting more interventions and improving market timing/storage."
-
 st.subheader("Actionable Recommendation")
 st.info(get_recommendation(farmer_row['predicted_credit_score'], 
                            farmer_row['phl_risk_score'], 
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pandas as pd
+
+from recommendation_rules import storage_prompts
+
+# Read paths for the farmer portal's PHL Prompts tab (agriconnect_farmers.db).
+# One query per render instead of one get_crops + get_temp_logs round trip per facility.
+
+PORTAL_DB = "agriconnect_farmers.db"
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_temp_logs_facility_time ON temp_logs(facility_id, log_time)",
+    "CREATE INDEX IF NOT EXISTS ix_crops_facility ON crops(facility_id)",
+    "CREATE INDEX IF NOT EXISTS ix_facilities_user ON facilities(user_id)",
+]
+
+# Latest reading per facility is an indexed max: with ix_temp_logs_facility_time the correlated
+# subquery is one index seek per facility, however many readings the facility has logged
+PHL_PROMPT_SQL = """
+    SELECT f.facility_id, f.name, f.location, c.crop_name,
+           (SELECT t.temperature FROM temp_logs t
+             WHERE t.facility_id = f.facility_id
+             ORDER BY t.log_time DESC LIMIT 1) AS temperature
+    FROM facilities f
+    LEFT JOIN crops c ON c.facility_id = f.facility_id
+    WHERE f.user_id = ?
+    ORDER BY f.facility_id, c.crop_id
+"""
+
+def ensure_indexes(conn):
+    for sql in INDEXES:
+        conn.execute(sql)
+
+def phl_prompt_rows(user_id, db_path=PORTAL_DB):
+    # One row per (facility, crop); facilities without crops have crop_name NULL, facilities
+    # without readings have temperature NULL. prompt is filled where both are present.
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query(PHL_PROMPT_SQL, conn, params=(user_id,))
+    finally:
+        conn.close()
+    df["prompt"] = None
+    ready = df["crop_name"].notna() & df["temperature"].notna()
+    if ready.any():
+        prompts, _ = storage_prompts(df.loc[ready, ["crop_name", "temperature"]])
+        df.loc[ready, "prompt"] = list(prompts)
+    return df
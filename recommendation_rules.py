@@ -0,0 +1,72 @@
+import pandas as pd
+
+from rules_engine import RuleSet
+
+# --- Farmer improvement advice (farmer_credit_scoring) ---
+# Evaluated with params yield_mean / loss_mean; bit i of advice_flags is ADVICE_RULES rule i.
+LOW_SCORE = ("credit_score", "<", 60)
+ADVICE_RULES = RuleSet([
+    {"name": "low_yield", "when": [LOW_SCORE, ("yield", "<", {"param": "yield_mean"})],
+     "message": "Increase your crop yield (e.g., use improved seeds or practices)."},
+    {"name": "high_loss", "when": [LOW_SCORE, ("loss_rate", ">", {"param": "loss_mean"})],
+     "message": "Reduce post-harvest losses (improve storage, transport)."},
+    {"name": "financial_access", "when": [LOW_SCORE, ("financial_access", "<", 2)],
+     "message": "Adopt mobile money or join a cooperative for better financial access."},
+    {"name": "tech_literacy", "when": [LOW_SCORE, ("tech_literacy", "<", 2)],
+     "message": "Use a smartphone for better access to markets and information."},
+    {"name": "experience", "when": [LOW_SCORE, ("experience_years", "<", 3)],
+     "message": "Seek mentorship or training to gain more experience."},
+    {"name": "extension", "when": [LOW_SCORE, ("extension_access", "==", 0)],
+     "message": "Access extension services for up-to-date farming advice."},
+    {"name": "cooperative", "when": [LOW_SCORE, ("cooperative_member", "==", 0)],
+     "message": "Join a farmers' cooperative for support and loans."},
+    {"name": "irrigation", "when": [LOW_SCORE, ("irrigation_access", "==", 0)],
+     "message": "Consider irrigation solutions to boost yields."},
+], mode="all", default="Keep up the good work!")
+
+# --- Loan recommendation (phl_credit_streamlit_app) ---
+LOAN_RULES = RuleSet([
+    {"name": "eligible_low_phl",
+     "when": [("predicted_credit_score", ">=", 0.7), ("phl_risk_score", "<=", 0.4)],
+     "message": "✅ Eligible for favorable loan. Low PHL risk."},
+    {"name": "eligible_high_phl",
+     "when": [("predicted_credit_score", ">=", 0.7), ("phl_risk_score", ">", 0.4)],
+     "message": "⚠️ Eligible for loan, but PHL risk is high. Adopt more PHL interventions!"},
+    {"name": "not_eligible",
+     "when": [("predicted_credit_score", "<", 0.5)],
+     "message": "❌ Improve repayment record or reduce PHL risk to qualify for credit."},
+], mode="first", default="Consider adopting more interventions and improving market timing/storage.")
+
+# --- Storage temperature prompts (farmer portal) ---
+# --- PHYSICAL THRESHOLDS for PHL risk (example values) ---
+CROP_TEMP_THRESHOLDS = {
+    "maize": 27,
+    "rice": 25,
+    "cassava": 25,
+    "wheat": 26,
+    "yam": 24,
+    "other": 26
+}
+STORAGE_RULES = RuleSet([
+    {"name": "too_hot",
+     "when": [("temperature", ">", {"lookup": CROP_TEMP_THRESHOLDS, "key": "crop_name",
+                                    "default": CROP_TEMP_THRESHOLDS["other"], "as": "threshold"})],
+     "message": "⚠️ Storage temperature ({temperature}°C) is too high for {crop_label}! "
+                "Reduce temperature to below {threshold:g}°C to prevent post-harvest losses."},
+], mode="first", default="✅ Temperature is safe for {crop_label}.")
+
+def get_recommendation(credit, risk, interventions):
+    return LOAN_RULES.evaluate_one({
+        "predicted_credit_score": credit,
+        "phl_risk_score": risk,
+        "interventions_adopted": interventions,
+    })
+
+def storage_prompts(df):
+    # df has crop_name and temperature columns (one row per crop/reading); returns (prompts, hit counts)
+    df = df.assign(crop_label=df["crop_name"].astype(str).str.title())
+    return STORAGE_RULES.evaluate(df)
+
+def phl_prompt(crop_name, temp):
+    prompts, _ = storage_prompts(pd.DataFrame({"crop_name": [crop_name], "temperature": [temp]}))
+    return prompts[0]
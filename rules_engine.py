@@ -0,0 +1,161 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+# A small rules engine for recommendations and prompts.
+#
+# Rules are plain data:
+#     {"name": "low_yield",
+#      "when": [("credit_score", "<", 60), ("yield", "<", {"param": "yield_mean"})],
+#      "message": "Increase your crop yield ..."}
+#
+# All conditions of a rule must hold. A condition value is either a literal, a list (for "in"),
+# {"param": name} for a value supplied at evaluation time, {"column": name} to compare two
+# columns, or {"lookup": {...}, "key": column, "default": value} for a per-row threshold
+# (keys are matched case-insensitively). Messages may use {column} / {param} placeholders and
+# any lookup value exposed with "as".
+#
+# A RuleSet compiles its rules once and evaluates a whole DataFrame in one pass. In "all" mode
+# every matching message is reported (as a bit flag per rule); in "first" mode rules behave like
+# an if/elif chain and the first match wins.
+
+OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+def _template_fields(message):
+    return [field for _, field, _, _ in string.Formatter().parse(message) if field]
+
+def _compile_value(spec):
+    # Returns (fn(df, params) -> scalar or array, exposed name or None)
+    if isinstance(spec, dict):
+        alias = spec.get("as")
+        if "param" in spec:
+            name = spec["param"]
+            return (lambda df, params: params[name]), alias
+        if "column" in spec:
+            name = spec["column"]
+            return (lambda df, params: df[name].to_numpy()), alias
+        if "lookup" in spec:
+            table = {str(k).lower(): v for k, v in spec["lookup"].items()}
+            key, default = spec["key"], spec.get("default")
+            def lookup(df, params):
+                values = df[key].astype(str).str.lower().map(table)
+                return values.fillna(default).to_numpy(dtype=float)
+            return lookup, alias
+        raise ValueError(f"Unknown value spec: {spec}")
+    return (lambda df, params: spec), None
+
+def _compile_condition(condition):
+    column, op, spec = condition
+    value_fn, alias = _compile_value(spec)
+    if op == "in":
+        values = list(spec)
+        return (lambda df, params, values_out: np.isin(df[column].to_numpy(), values)), alias
+    if op not in OPS:
+        raise ValueError(f"Unknown operator: {op}")
+    compare = OPS[op]
+    def predicate(df, params, values_out):
+        value = value_fn(df, params)
+        if alias:
+            values_out[alias] = value
+        return compare(df[column].to_numpy(), value)
+    return predicate, alias
+
+class RuleSet:
+    def __init__(self, rules, mode="all", default="", separator=" "):
+        if mode not in ("all", "first"):
+            raise ValueError("mode must be 'all' or 'first'")
+        if mode == "all" and len(rules) > 64:
+            raise ValueError("At most 64 rules fit in the flag column")
+        self.mode = mode
+        self.default = default
+        self.separator = separator
+        self.names = [rule["name"] for rule in rules]
+        self.messages = [rule["message"] for rule in rules]
+        self._conditions = [[_compile_condition(c)[0] for c in rule["when"]] for rule in rules]
+        self._templated = any(_template_fields(m) for m in self.messages + [default])
+
+    def masks(self, df, params=None):
+        # (n_rows, n_rules) boolean matrix plus any lookup values exposed for messages
+        params = params or {}
+        values = {}
+        out = np.zeros((len(df), len(self.names)), dtype=bool)
+        for i, conditions in enumerate(self._conditions):
+            mask = np.ones(len(df), dtype=bool)
+            for predicate in conditions:
+                mask &= predicate(df, params, values)
+            out[:, i] = mask
+        return out, values
+
+    def flags(self, masks):
+        # One bit per rule; uint8 is enough for up to eight rules
+        dtype = np.uint8 if masks.shape[1] <= 8 else np.uint64
+        weights = (np.ones(1, dtype=dtype) << np.arange(masks.shape[1], dtype=dtype))
+        return (masks.astype(dtype) * weights).sum(axis=1, dtype=dtype)
+
+    def first_match(self, masks):
+        # Index of the first matching rule per row, -1 where none matched
+        hit = masks.any(axis=1)
+        return np.where(hit, masks.argmax(axis=1), -1)
+
+    def hit_counts(self, masks):
+        if self.mode == "first":
+            chosen = self.first_match(masks)
+            counts = np.bincount(chosen + 1, minlength=len(self.names) + 1)
+            result = dict(zip(self.names, counts[1:].tolist()))
+            result["default"] = int(counts[0])
+            return result
+        result = dict(zip(self.names, masks.sum(axis=0).tolist()))
+        result["default"] = int((~masks.any(axis=1)).sum())
+        return result
+
+    def render_flags(self, flags, context=None):
+        parts = [m for i, m in enumerate(self.messages) if int(flags) & (1 << i)]
+        parts = [m.format_map(context) for m in parts] if context is not None else parts
+        if parts:
+            return self.separator.join(parts)
+        return self.default.format_map(context) if context is not None else self.default
+
+    def render(self, df, masks, values=None, params=None):
+        # Message text is built only here, for display or export
+        if self.mode == "first":
+            codes = self.first_match(masks)
+            templates = np.array(self.messages + [self.default], dtype=object)
+            chosen = templates[codes]  # -1 selects the default
+        else:
+            codes = self.flags(masks)
+        if not self._templated:
+            if self.mode == "first":
+                return chosen
+            unique_codes, inverse = np.unique(codes, return_inverse=True)
+            texts = np.array([self.render_flags(c) for c in unique_codes], dtype=object)
+            return texts[inverse]
+        # Templated messages need per-row values
+        context_cols = {k: np.broadcast_to(v, len(df)) for k, v in (values or {}).items()}
+        records = df.to_dict(orient="records")
+        out = np.empty(len(df), dtype=object)
+        for i, record in enumerate(records):
+            context = dict(params or {})
+            context.update(record)
+            context.update({k: v[i] for k, v in context_cols.items()})
+            if self.mode == "first":
+                out[i] = chosen[i].format_map(context)
+            else:
+                out[i] = self.render_flags(codes[i], context)
+        return out
+
+    def evaluate(self, df, params=None):
+        # Single pass over a portfolio: returns (messages, per-rule hit counts)
+        masks, values = self.masks(df, params)
+        return self.render(df, masks, values, params), self.hit_counts(masks)
+
+    def evaluate_one(self, record, params=None):
+        messages, _ = self.evaluate(pd.DataFrame([record]), params)
+        return messages[0]
@@ -0,0 +1,171 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Data refresh pipeline as a DAG of scripts with declared inputs and outputs.
+# A stage is skipped when the content hash of its script and inputs matches the last successful run
+# and its outputs are still there, unchanged. Stages whose dependencies are done run in parallel.
+
+STATE_FILE = ".pipeline_state.json"
+HASH_BLOCK = 1 << 20
+
+# Dependencies come from matching inputs to other stages' outputs, plus explicit "after" entries
+# (e.g. stages writing to the same SQLite database).
+STAGES = [
+    {"name": "generate_synthetic_datasets", "cmd": ["generate_synthetic_datasets.py"],
+     "inputs": [],
+     "outputs": ["synthetic_loan_repayment_large.csv", "phl_risk_results_large.csv"]},
+    {"name": "phl_credit_pipeline", "cmd": ["phl_credit_pipeline.py"],
+     "inputs": ["synthetic_loan_repayment_large.csv", "phl_risk_results_large.csv"],
+     "outputs": ["integrated_results.csv"]},
+    {"name": "check_and_fix_integrated_csv", "cmd": ["check_and_fix_integrated_csv.py"],
+     "inputs": ["integrated_results.csv", "synthetic_loan_repayment_large.csv", "phl_risk_results_large.csv"],
+     "outputs": ["integrated_results.csv", "integrated_results.check.json"]},  # exits 1 if still invalid
+    {"name": "integrated_store", "cmd": ["integrated_store.py"],
+     "inputs": ["integrated_results.csv"],
+     "outputs": ["integrated_results.arrow"]},
+    {"name": "csv_to_sqlite", "cmd": ["csv_to_sqlite.py"],
+     "inputs": ["integrated_results.csv"],
+     "outputs": []},  # agriconnect.db has other writers, so it is not tracked as an output
+    {"name": "score_explanations", "cmd": ["score_explanations.py"],
+     "inputs": ["synthetic_loan_repayment_large.csv", "phl_risk_results_large.csv", "models/phl_credit/ACTIVE"],
+     "outputs": [], "after": ["phl_credit_pipeline", "csv_to_sqlite"]},
+    {"name": "farmer_credit_scoring", "cmd": ["farmer_credit_scoring.py"],
+     "inputs": ["youth_farmers.csv", "crop_production.csv", "post_harvest_losses_cleaned.csv", "loan_repayement.csv"],
+     "outputs": ["farmer_credit_scores.csv"]},
+    {"name": "train_and_export_model", "cmd": ["train_and_export_model.py"],
+     "inputs": ["youth_farmers.csv"],
+     "outputs": ["your_model.joblib"]},
+]
+
+def _stat_key(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def file_hash(path, cache):
+    # Content hash, reused from the previous run while size and mtime are unchanged
+    if not os.path.exists(path):
+        return "missing"
+    key = _stat_key(path)
+    cached = cache.get(path)
+    if cached and cached["stat"] == key:
+        return cached["sha1"]
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    cache[path] = {"stat": key, "sha1": h.hexdigest()}
+    return cache[path]["sha1"]
+
+def fingerprint(stage, cache):
+    h = hashlib.sha1(json.dumps(stage["cmd"]).encode())
+    for path in [stage["cmd"][0]] + sorted(stage["inputs"]):
+        h.update(f"{path}={file_hash(path, cache)};".encode())
+    return h.hexdigest()
+
+def dependencies(stages):
+    names = {s["name"] for s in stages}
+    producers = {}
+    for s in stages:
+        for out in s["outputs"]:
+            producers.setdefault(out, []).append(s["name"])
+    deps = {}
+    for s in stages:
+        found = {p for inp in s["inputs"] for p in producers.get(inp, []) if p != s["name"]}
+        deps[s["name"]] = (found | set(s.get("after", []))) & names
+    return deps
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {"stages": {}, "hashes": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+def is_up_to_date(stage, state):
+    record = state["stages"].get(stage["name"])
+    if record is None or record["fingerprint"] != fingerprint(stage, state["hashes"]):
+        return False
+    for out in stage["outputs"]:
+        if not os.path.exists(out) or record["outputs"].get(out) != _stat_key(out):
+            return False
+    return True
+
+def run(stages=STAGES, jobs=4, force=False, state_file=STATE_FILE):
+    state = load_state(state_file)
+    deps = dependencies(stages)
+    by_name = {s["name"]: s for s in stages}
+    lock = threading.Lock()
+    results = {}
+
+    def run_stage(stage):
+        start = time.time()
+        with lock:
+            fresh = not force and is_up_to_date(stage, state)
+        if fresh:
+            return "skipped", time.time() - start, ""
+        proc = subprocess.run([sys.executable] + stage["cmd"], capture_output=True, text=True)
+        missing = [out for out in stage["outputs"] if not os.path.exists(out)]
+        if proc.returncode != 0 or missing:
+            detail = proc.stderr.strip().splitlines()[-1:] or [f"missing outputs {missing}"]
+            return "failed", time.time() - start, detail[0]
+        with lock:
+            # Fingerprinted after the run, so a stage that rewrites its own input is stable next time
+            state["stages"][stage["name"]] = {
+                "fingerprint": fingerprint(stage, state["hashes"]),
+                "outputs": {out: _stat_key(out) for out in stage["outputs"]},
+                "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            save_state(state, state_file)
+        return "ran", time.time() - start, ""
+
+    start = time.time()
+    pending = [s["name"] for s in stages]
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in list(pending):
+                states = [results.get(d, ("pending",))[0] for d in deps[name]]
+                if any(st in ("failed", "blocked") for st in states):
+                    results[name] = ("blocked", 0.0, "an upstream stage failed")
+                    pending.remove(name)
+                elif all(st in ("ran", "skipped") for st in states):
+                    running[pool.submit(run_stage, by_name[name])] = name
+                    pending.remove(name)
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Dependency cycle among stages: {pending}")
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                results[name] = fut.result()
+                print(f"[{results[name][0]:>7}] {name} ({results[name][1]:.2f}s)", flush=True)
+
+    print("\nStage timings:")
+    for s in stages:
+        status, seconds, detail = results[s["name"]]
+        print(f"  {s['name']:<32} {status:<8} {seconds:8.2f}s  {detail}")
+    print(f"Pipeline finished in {time.time() - start:.2f}s.")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the data refresh pipeline, skipping up-to-date stages")
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Run every stage regardless of fingerprints")
+    parser.add_argument("--only", nargs="*", help="Run only these stages (their dependencies must be up to date)")
+    args = parser.parse_args()
+    selected = [s for s in STAGES if not args.only or s["name"] in args.only]
+    results = run(selected, args.jobs, args.force)
+    sys.exit(1 if any(r[0] in ("failed", "blocked") for r in results.values()) else 0)
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+import model_store
+from phl_credit_pipeline import MODEL_NAME, FEATURES, load_data, build_features
+
+DB_PATH = "agriconnect.db"
+TABLE_NAME = "score_explanations"
+TOP_K = 5
+CHUNK_SIZE = 100000
+
+def _tree_weights(tree, n_features, class_idx):
+    # Each non-root node contributes value[node] - value[parent] to the feature its parent split on.
+    # Returns a (n_nodes, n_features) sparse matrix so a decision-path indicator times it gives contributions.
+    t = tree.tree_
+    value = t.value[:, 0, :]
+    value = value / value.sum(axis=1, keepdims=True)
+    p = value[:, class_idx]
+    parent = np.full(t.node_count, -1)
+    internal = np.where(t.children_left >= 0)[0]
+    parent[t.children_left[internal]] = internal
+    parent[t.children_right[internal]] = internal
+    nodes = np.where(parent >= 0)[0]
+    delta = p[nodes] - p[parent[nodes]]
+    W = sp.csr_matrix((delta, (nodes, t.feature[parent[nodes]])), shape=(t.node_count, n_features))
+    return p[0], W
+
+def explain(model, X):
+    # Decision-path contributions averaged over the forest: score = bias + contributions.sum(axis=1)
+    X = np.asarray(X, dtype=np.float32)
+    class_idx = list(model.classes_).index(1) if 1 in model.classes_ else 0
+    bias = 0.0
+    contributions = np.zeros((len(X), X.shape[1]))
+    for tree in model.estimators_:
+        tree_bias, W = _tree_weights(tree, X.shape[1], class_idx)
+        indicator = tree.decision_path(X)
+        bias += tree_bias
+        contributions += (indicator @ W).toarray()
+    n_trees = len(model.estimators_)
+    return bias / n_trees, contributions / n_trees
+
+def top_contributors(contributions, features, k=TOP_K):
+    # Largest absolute contributions first, as [[feature, contribution], ...] per row
+    order = np.argsort(-np.abs(contributions), axis=1)[:, :k]
+    picked = np.take_along_axis(contributions, order, axis=1)
+    names = np.asarray(features)[order]
+    return [
+        [[str(n), round(float(v), 4)] for n, v in zip(row_names, row_vals)]
+        for row_names, row_vals in zip(names, picked)
+    ]
+
+def init_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            farmer_id TEXT PRIMARY KEY,
+            model_version TEXT,
+            base_value REAL,
+            top_features TEXT
+        )
+    """)
+
+def compute_explanations(db_path=DB_PATH, top_k=TOP_K, chunk_size=CHUNK_SIZE):
+    start = time.time()
+    model, meta = model_store.load_model(MODEL_NAME)
+    credit_df, phl_df = load_data()
+    df = build_features(credit_df, phl_df)
+    conn = sqlite3.connect(db_path)
+    try:
+        init_table(conn)
+        with conn:
+            conn.execute(f"DELETE FROM {TABLE_NAME}")
+            for i in range(0, len(df), chunk_size):
+                chunk = df.iloc[i:i + chunk_size]
+                bias, contributions = explain(model, chunk[FEATURES])
+                tops = top_contributors(contributions, FEATURES, top_k)
+                conn.executemany(
+                    f"INSERT INTO {TABLE_NAME} (farmer_id, model_version, base_value, top_features) VALUES (?, ?, ?, ?)",
+                    zip(chunk['farmer_id'], [meta['version']] * len(chunk), [float(bias)] * len(chunk),
+                        [json.dumps(t) for t in tops])
+                )
+    finally:
+        conn.close()
+    print(f"Stored top-{top_k} explanations for {len(df)} farmers in {time.time() - start:.2f}s.")
+
+def get_explanation(farmer_id, db_path=DB_PATH):
+    # Point lookup for profile pages; returns None when no explanation is stored
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            f"SELECT model_version, base_value, top_features FROM {TABLE_NAME} WHERE farmer_id=?", (str(farmer_id),)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {"model_version": row[0], "base_value": row[1], "top_features": json.loads(row[2])}
+
+if __name__ == "__main__":
+    compute_explanations()
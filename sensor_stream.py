@@ -0,0 +1,189 @@
+import argparse
+import json
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+import temp_rollups
+
+# Simulated storage-facility sensors: every facility reports temperature and humidity once a minute.
+# Readings follow a diurnal cycle around a per-facility baseline, with slow per-facility drift and
+# occasional faults (stuck sensor, spikes, dropped readings).
+
+DB_PATH = "agriconnect_farmers.db"
+START = "2025-01-01 00:00:00"
+MINUTES_PER_DAY = 1440
+
+DIURNAL_AMPLITUDE = 3.0       # °C, peak mid-afternoon
+DRIFT_PER_DAY = 0.05          # °C, std of the daily random-walk step
+NOISE = 0.3                   # °C
+FAULT_START_PROB = 1e-4       # per facility per minute
+FAULT_MEAN_MINUTES = 30
+FAULT_TYPES = np.array(["stuck", "spike", "dropout"])
+SPIKE = 12.0                  # °C added while a spike fault is active
+
+INSERT_SQL = "INSERT INTO temp_logs (facility_id, temperature, humidity, log_time) VALUES (?, ?, ?, ?)"
+
+class SensorFleet:
+    def __init__(self, facility_ids, seed=42, start=START):
+        self.facility_ids = np.asarray(facility_ids, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+        self.start = pd.Timestamp(start)
+        self.minute = 0
+        n = len(self.facility_ids)
+        self.base_temp = self.rng.normal(25, 2, n)
+        self.base_humidity = self.rng.uniform(50, 75, n)
+        self.phase = self.rng.normal(0, 30, n)  # minutes, so facilities don't peak in lockstep
+        self.drift = np.zeros(n)
+        self.fault = np.full(n, -1)             # index into FAULT_TYPES, -1 when healthy
+        self.fault_left = np.zeros(n, dtype=np.int64)
+        self.last_temp = self.base_temp.copy()
+        self.last_humidity = self.base_humidity.copy()
+
+    def _step_faults(self):
+        n = len(self.facility_ids)
+        self.fault_left -= 1
+        self.fault[self.fault_left <= 0] = -1
+        starting = (self.fault < 0) & (self.rng.random(n) < FAULT_START_PROB)
+        k = int(starting.sum())
+        if k:
+            self.fault[starting] = self.rng.integers(0, len(FAULT_TYPES), k)
+            self.fault_left[starting] = self.rng.geometric(1 / FAULT_MEAN_MINUTES, k)
+
+    def next_block(self, minutes):
+        # One DataFrame with a row per facility per minute (dropped readings omitted), in time order
+        n = len(self.facility_ids)
+        temps = np.empty((minutes, n))
+        hums = np.empty((minutes, n))
+        keep = np.ones((minutes, n), dtype=bool)
+        for m in range(minutes):
+            t = self.minute + m
+            if t % MINUTES_PER_DAY == 0:
+                self.drift += self.rng.normal(0, DRIFT_PER_DAY, n)
+            self._step_faults()
+            cycle = np.sin(2 * np.pi * ((t + self.phase) % MINUTES_PER_DAY - 540) / MINUTES_PER_DAY)
+            temp = self.base_temp + self.drift + DIURNAL_AMPLITUDE * cycle + self.rng.normal(0, NOISE, n)
+            hum = self.base_humidity - 2.0 * DIURNAL_AMPLITUDE * cycle + self.rng.normal(0, 1.0, n)
+            stuck = self.fault == 0
+            temp[stuck] = self.last_temp[stuck]
+            hum[stuck] = self.last_humidity[stuck]
+            temp[self.fault == 1] += SPIKE
+            keep[m] = self.fault != 2
+            self.last_temp, self.last_humidity = temp, hum
+            temps[m], hums[m] = temp, hum
+        times = self.start + pd.to_timedelta(np.arange(self.minute, self.minute + minutes), unit="min")
+        self.minute += minutes
+        mask = keep.ravel()
+        return pd.DataFrame({
+            "facility_id": np.tile(self.facility_ids, minutes)[mask],
+            "temperature": np.round(temps.ravel()[mask], 2),
+            "humidity": np.round(np.clip(hums.ravel(), 0, 100)[mask], 1),
+            "log_time": np.repeat(times.strftime("%Y-%m-%d %H:%M:%S").to_numpy(), n)[mask],
+        })
+
+def ensure_schema(conn):
+    # Portal schema plus the humidity column the sensors report
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS temp_logs (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            facility_id INTEGER,
+            temperature REAL,
+            log_time TEXT,
+            FOREIGN KEY(facility_id) REFERENCES facilities(facility_id)
+        )
+    """)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(temp_logs)")]
+    if "humidity" not in cols:
+        conn.execute("ALTER TABLE temp_logs ADD COLUMN humidity REAL")
+    temp_rollups.install(conn)
+
+def facility_ids_from_db(db_path, limit=None):
+    conn = sqlite3.connect(db_path)
+    try:
+        sql = "SELECT facility_id FROM facilities ORDER BY facility_id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [r[0] for r in conn.execute(sql)]
+    finally:
+        conn.close()
+
+def write_sqlite(fleet, minutes, db_path=DB_PATH, batch_minutes=60):
+    # One transaction per block of batch_minutes * n_facilities readings
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    ensure_schema(conn)
+    start = time.time()
+    written = 0
+    try:
+        done = 0
+        while done < minutes:
+            block = fleet.next_block(min(batch_minutes, minutes - done))
+            conn.execute("BEGIN")
+            conn.executemany(INSERT_SQL, block.itertuples(index=False, name=None))
+            temp_rollups.refresh(conn)
+            conn.execute("COMMIT")
+            written += len(block)
+            done += batch_minutes
+    finally:
+        conn.close()
+    elapsed = time.time() - start
+    print(f"Wrote {written:,} readings in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} readings/s).")
+    return written
+
+def _post(url, data):
+    # Resends the batch while the endpoint pushes back (429/503 with Retry-After)
+    while True:
+        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503):
+                raise
+            time.sleep(float(e.headers.get("Retry-After", 1)))
+
+def replay(fleet, minutes, url, rate=10000, batch_size=1000):
+    # POST {"readings": [...]} batches to an ingestion endpoint, paced to `rate` readings per second
+    start = time.time()
+    sent = 0
+    done = 0
+    while done < minutes:
+        block = fleet.next_block(1)
+        done += 1
+        records = block.to_dict(orient="records")
+        for i in range(0, len(records), batch_size):
+            batch = records[i:i + batch_size]
+            _post(url, json.dumps({"readings": batch}).encode())
+            sent += len(batch)
+            ahead = sent / rate - (time.time() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+    elapsed = time.time() - start
+    print(f"Replayed {sent:,} readings to {url} in {elapsed:.1f}s ({sent / max(elapsed, 1e-9):,.0f} readings/s).")
+    return sent
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate per-minute storage sensor readings for temp_logs")
+    parser.add_argument("--facilities", type=int, default=1000)
+    parser.add_argument("--from-db", action="store_true", help="Use facility ids from the facilities table")
+    parser.add_argument("--minutes", type=int, default=MINUTES_PER_DAY)
+    parser.add_argument("--start", default=START)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--batch-minutes", type=int, default=60)
+    parser.add_argument("--url", default=None, help="Replay to this ingestion endpoint instead of writing SQLite, e.g. http://localhost:8001/readings")
+    parser.add_argument("--rate", type=float, default=10000, help="Replay rate in readings per second")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    ids = facility_ids_from_db(args.db, args.facilities) if args.from_db else range(1, args.facilities + 1)
+    fleet = SensorFleet(ids, args.seed, args.start)
+    if args.url:
+        replay(fleet, args.minutes, args.url, args.rate, args.batch_size)
+    else:
+        write_sqlite(fleet, args.minutes, args.db, args.batch_minutes)
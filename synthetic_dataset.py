@@ -0,0 +1,266 @@
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_generator import generate_farmers_chunk
+import temp_rollups
+
+# One seeded generator for every synthetic table, with consistent keys:
+#   youth_farmers, loan repayments and PHL results share farmer_id (YF1000, YF1001, ...),
+#   portal users/facilities/crops/temp_logs hang off those farmers, and market prices
+#   cover the same crops and regions.
+# Farmers are split into fixed-size partitions. Each partition is generated independently in
+# a worker process from SeedSequence([seed, partition]), so the output depends only on the
+# seed and partition size, never on the number of workers.
+
+FIRST_ID = 1000
+PARTITION_SIZE = 100_000
+OUT_DIR = "synthetic_data"
+
+PHONE_TO_TECH = {'Basic': 'Low', 'Feature': 'Medium', 'Smart': 'High'}
+EDU_CODE = {'Primary': 0, 'Secondary': 1, 'Tertiary': 2}
+FIN_CODE = {'None': 0, 'Limited': 1, 'Some': 2, 'Full': 3}
+MAX_FACILITIES = 3
+MAX_CROPS = 3
+
+MARKETS = [
+    ("Dawanau", "Kano"), ("Yankaba", "Kano"), ("Bodija", "Oyo"), ("Wurukum", "Benue"),
+    ("Kawo", "Kaduna"), ("Terminus", "Plateau"), ("Mile 12", "Lagos"), ("Wuse", "Abuja"),
+]
+BASE_PRICE = {'Maize': 250, 'Rice': 600, 'Tomatoes': 300, 'Yam': 400, 'Cassava': 150}
+
+OUTPUT_FILES = {
+    'farmers': 'youth_farmers.csv',
+    'loans': 'synthetic_loan_repayment_large.csv',
+    'phl': 'phl_risk_results_large.csv',
+    'users': 'users.csv',
+    'facilities': 'facilities.csv',
+    'crops': 'crops.csv',
+    'temp_logs': 'temp_logs.csv',
+    'market_prices': 'market_prices.csv',
+}
+PORTAL_TABLES = ['users', 'facilities', 'crops', 'temp_logs']
+# Key column of each portal table, and the keys it references
+PORTAL_KEYS = {
+    'users': ('user_id', {}),
+    'facilities': ('facility_id', {'user_id': 'users'}),
+    'crops': ('crop_id', {'facility_id': 'facilities'}),
+    'temp_logs': ('log_id', {'facility_id': 'facilities'}),
+}
+
+def generate_phl(rng, farmers):
+    n = len(farmers)
+    interventions = rng.integers(0, 4, n)
+    risk = (rng.beta(2, 3, n)
+            + (farmers['crop_type'] == 'Tomatoes').to_numpy() * 0.25
+            + (farmers['region'] == 'Kano').to_numpy() * 0.10
+            - interventions * 0.05)
+    risk = np.clip(risk, 0, 1)
+    return pd.DataFrame({
+        'farmer_id': farmers['farmer_id'],
+        'phl_risk_score': np.round(risk, 2),
+        'avg_annual_phl_loss': np.round(risk * rng.uniform(0.07, 0.25, n), 3),
+        'interventions_adopted': interventions,
+    })
+
+def generate_loans(rng, farmers, phl):
+    n = len(farmers)
+    prev_loan = rng.binomial(1, 0.4, n)
+    edu = farmers['education_level'].map(EDU_CODE).to_numpy(dtype=float)
+    fin = farmers['financial_access'].map(FIN_CODE).to_numpy(dtype=float)
+    # Repayment improves with education and financial access, drops with prior loans and PHL risk
+    p = 0.65 - 0.2 * prev_loan + 0.05 * edu + 0.04 * fin - 0.25 * phl['phl_risk_score'].to_numpy()
+    return pd.DataFrame({
+        'farmer_id': farmers['farmer_id'],
+        'age': farmers['age'],
+        'education': farmers['education_level'],
+        'farm_size': farmers['farm_size'],
+        'crop_type': farmers['crop_type'],
+        'region': farmers['region'],
+        'tech_literacy': farmers['phone_type'].map(PHONE_TO_TECH),
+        'financial_access': farmers['financial_access'],
+        'prev_loan': prev_loan,
+        'repayment_status': rng.binomial(1, np.clip(p, 0.05, 0.95)),
+    })
+
+def generate_portal(rng, farmers, first_index, user_fraction, temp_days, start_date):
+    # Integer keys are derived from the farmer's global index, so they are unique across partitions
+    is_user = rng.random(len(farmers)) < user_fraction
+    users_src = farmers[is_user]
+    user_id = first_index + np.flatnonzero(is_user) + 1
+    users = pd.DataFrame({
+        'user_id': user_id,
+        'username': users_src['farmer_id'].str.lower().to_numpy(),
+        'password': 'demo',
+    })
+
+    n_fac = rng.integers(1, MAX_FACILITIES + 1, len(users))
+    fac_user = np.repeat(user_id, n_fac)
+    fac_slot = np.concatenate([np.arange(k) for k in n_fac]) if len(n_fac) else np.array([], dtype=int)
+    facility_id = fac_user * MAX_FACILITIES + fac_slot
+    fac_region = np.repeat(users_src['region'].astype(str).to_numpy(), n_fac)
+    fac_crop = np.repeat(users_src['crop_type'].astype(str).to_numpy(), n_fac)
+    facilities = pd.DataFrame({
+        'facility_id': facility_id,
+        'user_id': fac_user,
+        'name': [f"Store {s + 1}" for s in fac_slot],
+        'location': fac_region,
+    })
+
+    n_crops = rng.integers(1, MAX_CROPS + 1, len(facilities))
+    crop_fac = np.repeat(facility_id, n_crops)
+    crop_slot = np.concatenate([np.arange(k) for k in n_crops]) if len(n_crops) else np.array([], dtype=int)
+    crop_names = np.array(list(BASE_PRICE))[rng.integers(0, len(BASE_PRICE), len(crop_fac))]
+    # The first crop in each facility is the farmer's main crop
+    crop_names = np.where(crop_slot == 0, np.repeat(fac_crop, n_crops), crop_names)
+    crops = pd.DataFrame({
+        'crop_id': crop_fac * MAX_CROPS + crop_slot,
+        'facility_id': crop_fac,
+        'crop_name': crop_names,
+        'quantity': np.round(rng.uniform(1, 50, len(crop_fac)), 1),
+    })
+
+    log_fac = np.repeat(facility_id, temp_days)
+    day = np.tile(np.arange(temp_days), len(facility_id))
+    temperature = 24 + 3 * np.sin(2 * np.pi * day / 30) + rng.normal(0, 1.5, len(log_fac))
+    temp_logs = pd.DataFrame({
+        'log_id': log_fac * temp_days + day,
+        'facility_id': log_fac,
+        'temperature': np.round(temperature, 1),
+        'log_time': (pd.Timestamp(start_date) + pd.to_timedelta(day, unit='D')).strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    return users, facilities, crops, temp_logs
+
+def generate_market_prices(seed, n_weeks):
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 2**31]))
+    rows = []
+    for crop, base in BASE_PRICE.items():
+        for market, region in MARKETS:
+            week = np.arange(1, n_weeks + 1)
+            price = base * (1 + 0.15 * np.sin(2 * np.pi * week / 52)) * rng.lognormal(0, 0.08, n_weeks)
+            volume = rng.integers(10, 60, n_weeks)
+            demand = np.where(price > base * 1.1, 'High', np.where(price < base * 0.9, 'Low', 'Medium'))
+            rows.append(pd.DataFrame({
+                'crop_type': crop, 'market_name': market, 'region': region, 'week_number': week,
+                'price_naira_per_kg': np.round(price).astype(int), 'available_volume_tons': volume,
+                'demand_strength': demand,
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+def generate_partition(args):
+    seed, partition, n_farmers, partition_size, user_fraction, temp_days, start_date = args
+    first_index = partition * partition_size
+    n = min(partition_size, n_farmers - first_index)
+    farmer_ss, phl_ss, loan_ss, portal_ss = np.random.SeedSequence([seed, partition]).spawn(4)
+    farmers = generate_farmers_chunk(np.random.default_rng(farmer_ss), FIRST_ID + first_index, n)
+    phl = generate_phl(np.random.default_rng(phl_ss), farmers)
+    loans = generate_loans(np.random.default_rng(loan_ss), farmers, phl)
+    users, facilities, crops, temp_logs = generate_portal(
+        np.random.default_rng(portal_ss), farmers, first_index, user_fraction, temp_days, start_date
+    )
+    return {
+        'farmers': farmers, 'loans': loans, 'phl': phl,
+        'users': users, 'facilities': facilities, 'crops': crops, 'temp_logs': temp_logs,
+    }
+
+def init_portal_db(conn):
+    # Same schema as agriconnect_farmers_portal.init_db
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password TEXT);
+        CREATE TABLE IF NOT EXISTS facilities (facility_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, name TEXT, location TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(user_id));
+        CREATE TABLE IF NOT EXISTS crops (crop_id INTEGER PRIMARY KEY AUTOINCREMENT, facility_id INTEGER, crop_name TEXT, quantity REAL,
+            FOREIGN KEY(facility_id) REFERENCES facilities(facility_id));
+        CREATE TABLE IF NOT EXISTS temp_logs (log_id INTEGER PRIMARY KEY AUTOINCREMENT, facility_id INTEGER, temperature REAL, log_time TEXT,
+            FOREIGN KEY(facility_id) REFERENCES facilities(facility_id));
+    """)
+
+def portal_id_offsets(conn):
+    # Highest key in use per portal table (AUTOINCREMENT's sequence included), so synthetic rows
+    # are numbered after the accounts and readings already in the database
+    seq = dict(conn.execute("SELECT name, seq FROM sqlite_sequence"))
+    return {
+        name: max(conn.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {name}").fetchone()[0], seq.get(name, 0))
+        for name, (key, _) in PORTAL_KEYS.items()
+    }
+
+def offset_portal_ids(tables, offsets):
+    shifted = {}
+    for name, (key, refs) in PORTAL_KEYS.items():
+        df = tables[name].copy()
+        df[key] += offsets[name]
+        for col, ref in refs.items():
+            df[col] += offsets[ref]
+        shifted[name] = df
+    return shifted
+
+def generate(n_farmers, out_dir=OUT_DIR, seed=42, partition_size=PARTITION_SIZE, workers=None,
+             user_fraction=0.05, temp_days=30, n_weeks=52, start_date="2025-01-01", portal_db=None):
+    start = time.time()
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {k: os.path.join(out_dir, v) for k, v in OUTPUT_FILES.items()}
+    counts = dict.fromkeys(OUTPUT_FILES, 0)
+    conn = None
+    if portal_db:
+        conn = sqlite3.connect(portal_db)
+        init_portal_db(conn)
+        offsets = portal_id_offsets(conn)
+
+    n_partitions = (n_farmers + partition_size - 1) // partition_size
+    tasks = [(seed, p, n_farmers, partition_size, user_fraction, temp_days, start_date) for p in range(n_partitions)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in partition order, so files are identical whatever the worker count
+            for i, tables in enumerate(pool.map(generate_partition, tasks)):
+                for name, df in tables.items():
+                    df.to_csv(paths[name], mode="w" if i == 0 else "a", header=(i == 0), index=False)
+                    counts[name] += len(df)
+                if conn is not None:
+                    # Keys in the database start after its existing rows (the CSVs keep the unshifted
+                    # keys); a plain INSERT so a collision, e.g. a username already taken, fails loudly
+                    portal = offset_portal_ids(tables, offsets)
+                    with conn:
+                        for name in PORTAL_TABLES:
+                            df = portal[name]
+                            conn.executemany(
+                                f"INSERT INTO {name} ({', '.join(df.columns)}) VALUES ({', '.join('?' * len(df.columns))})",
+                                df.astype(object).itertuples(index=False, name=None)
+                            )
+        if conn is not None:
+            # New readings all sit above the rollup watermark, so folding them in is enough; a rebuild
+            # would lose the history of anything temp_rollups.compact() already removed
+            temp_rollups.install(conn)
+            with conn:
+                temp_rollups.refresh(conn)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    prices = generate_market_prices(seed, n_weeks)
+    prices.to_csv(paths['market_prices'], index=False)
+    counts['market_prices'] = len(prices)
+
+    print(f"Generated {n_farmers:,} farmers in {n_partitions} partitions in {time.time() - start:.1f}s:")
+    for name, path in paths.items():
+        print(f"  {path}: {counts[name]:,} rows")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a consistent, seeded multi-table synthetic dataset")
+    parser.add_argument("--farmers", type=int, default=200)
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--partition-size", type=int, default=PARTITION_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--user-fraction", type=float, default=0.05)
+    parser.add_argument("--temp-days", type=int, default=30)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--portal-db", default=None, help="Also load portal tables into this SQLite file")
+    args = parser.parse_args()
+    generate(args.farmers, args.out_dir, args.seed, args.partition_size, args.workers,
+             args.user_fraction, args.temp_days, args.weeks, portal_db=args.portal_db)
@@ -0,0 +1,288 @@
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from recommendation_rules import CROP_TEMP_THRESHOLDS
+
+# Streaming storage-temperature alerts. Every reading is checked against the threshold of each crop
+# stored in its facility (CROP_TEMP_THRESHOLDS, as in the PHL prompts). Per (facility, threshold)
+# the engine keeps a fixed ring of BUCKETS buckets covering the last WINDOW_HOURS, so state and work
+# per reading are constant, and tracks over that sliding window:
+#   degree_hours - (temperature - threshold) integrated over the time above threshold, °C·h
+#   time_over    - hours above threshold
+# An alert opens when a metric reaches its limit and resolves once it drops below RESOLVE_FRACTION
+# of the limit. At most one alert per facility, crop and kind is open at a time; a partial unique
+# index enforces the same in the table, so a restarted engine never duplicates an open alert.
+
+DB_PATH = "agriconnect_farmers.db"
+ALERTS_TABLE = "temp_alerts"
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+WINDOW_HOURS = 24
+BUCKETS = 24                  # hourly buckets
+MAX_GAP_MINUTES = 15          # a reading accounts for at most this long; dropouts accrue nothing
+LIMITS = {"degree_hours": 12.0, "time_over": 4.0}
+KINDS = list(LIMITS)
+RESOLVE_FRACTION = 0.5
+MONITOR_REFRESH_S = 60        # how often the facility -> crops mapping is reloaded from crops
+
+def init_db(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ALERTS_TABLE} (
+            alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            facility_id INTEGER NOT NULL,
+            crop_name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            threshold REAL NOT NULL,
+            value REAL NOT NULL,
+            opened_at TEXT NOT NULL,
+            resolved_at TEXT
+        )
+    """)
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{ALERTS_TABLE}_open ON {ALERTS_TABLE}(facility_id, crop_name, kind) "
+        "WHERE resolved_at IS NULL"
+    )
+
+def crop_threshold(crop_name):
+    return float(CROP_TEMP_THRESHOLDS.get(str(crop_name).lower(), CROP_TEMP_THRESHOLDS["other"]))
+
+def _to_seconds(log_times):
+    return pd.to_datetime(pd.Series(log_times), format=LOG_TIME_FORMAT).to_numpy().astype("datetime64[s]").astype(np.int64)
+
+class AlertEngine:
+    # Batches are evaluated in rounds: round r holds the r-th reading of every monitor in the batch,
+    # so each round is a handful of numpy operations over distinct monitors, and readings of one
+    # monitor are still applied in time order.
+
+    def __init__(self, window_hours=WINDOW_HOURS, buckets=BUCKETS, limits=None):
+        self.bucket_s = window_hours * 3600 // buckets
+        self.n_buckets = buckets
+        self.limits = np.array([(limits or LIMITS)[k] for k in KINDS])
+        self.max_gap_s = MAX_GAP_MINUTES * 60
+        self._keys = {}                  # (facility_id, threshold) -> monitor
+        self.facility = np.zeros(0, dtype=np.int64)
+        self.threshold = np.zeros(0)
+        self.last_t = np.zeros(0, dtype=np.int64)
+        self.cur_b = np.zeros(0, dtype=np.int64)
+        self.ring = np.zeros((0, buckets, len(KINDS)))
+        self.open = np.zeros((0, len(KINDS)), dtype=bool)
+        self.crops = []                  # monitor -> crop names sharing its threshold
+        self._fac_index = pd.Index(np.zeros(0, dtype=np.int64))
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._members = np.zeros(0, dtype=np.int64)
+        self._pending = None             # state of the last flushed batch, applied once it commits
+        self.loaded_at = None
+        self.readings = 0
+        self.evaluations = 0
+
+    def set_monitors(self, crops):
+        # crops: facility_id, crop_name. Monitors that already exist keep their window state.
+        crops = crops.dropna(subset=["facility_id", "crop_name"])
+        by_key = {}
+        for facility_id, crop_name in zip(crops["facility_id"].astype(np.int64), crops["crop_name"].astype(str)):
+            by_key.setdefault((int(facility_id), crop_threshold(crop_name)), set()).add(crop_name)
+        new = [k for k in by_key if k not in self._keys]
+        for key in new:
+            self._keys[key] = len(self._keys)
+        n_new = len(new)
+        self.facility = np.concatenate([self.facility, np.array([k[0] for k in new], dtype=np.int64)])
+        self.threshold = np.concatenate([self.threshold, np.array([k[1] for k in new], dtype=float)])
+        self.last_t = np.concatenate([self.last_t, np.full(n_new, -1, dtype=np.int64)])
+        self.cur_b = np.concatenate([self.cur_b, np.zeros(n_new, dtype=np.int64)])
+        self.ring = np.concatenate([self.ring, np.zeros((n_new, self.n_buckets, len(KINDS)))])
+        self.open = np.concatenate([self.open, np.zeros((n_new, len(KINDS)), dtype=bool)])
+        self.crops += [[] for _ in new]
+        for key, names in by_key.items():
+            self.crops[self._keys[key]] = sorted(names)
+        # facility -> monitors as CSR arrays over the sorted facility ids; removed crops drop out here
+        active = sorted((key[0], self._keys[key]) for key in by_key)
+        fac = np.array([a[0] for a in active], dtype=np.int64)
+        self._members = np.array([a[1] for a in active], dtype=np.int64)
+        self._fac_index = pd.Index(np.unique(fac))
+        self._offsets = np.searchsorted(fac, np.append(self._fac_index.to_numpy(), np.iinfo(np.int64).max))
+
+    def load(self, conn):
+        init_db(conn)
+        first = self.loaded_at is None
+        # The sensor service can start on a database the portal hasn't created crops in yet
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='crops'").fetchone():
+            crops = pd.read_sql_query("SELECT DISTINCT facility_id, crop_name FROM crops WHERE crop_name IS NOT NULL", conn)
+        else:
+            crops = pd.DataFrame(columns=["facility_id", "crop_name"])
+        self.set_monitors(crops)
+        if first:
+            # Alerts left open by a previous run stay open instead of being raised again
+            for facility_id, crop_name, kind in conn.execute(
+                f"SELECT facility_id, crop_name, kind FROM {ALERTS_TABLE} WHERE resolved_at IS NULL"
+            ):
+                m = self._keys.get((facility_id, crop_threshold(crop_name)))
+                if m is not None and kind in KINDS:
+                    self.open[m, KINDS.index(kind)] = True
+        self.loaded_at = time.time()
+
+    def _expand(self, facility_ids):
+        # One row per (reading of a known facility, monitor of that facility):
+        # returns (known readings mask, index into the known readings, monitor)
+        pos = self._fac_index.get_indexer(np.asarray(facility_ids, dtype=np.int64))
+        known = pos >= 0
+        pos = pos[known]
+        counts = self._offsets[pos + 1] - self._offsets[pos]
+        reading = np.repeat(np.arange(len(pos)), counts)
+        within = np.arange(len(reading)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return known, reading, self._members[np.repeat(self._offsets[pos], counts) + within]
+
+    def process(self, facility_ids, temperatures, times):
+        # times in epoch seconds. Returns events (monitor, kind, "open" | "resolve", time, value).
+        known, reading, mon = self._expand(facility_ids)
+        temps = np.asarray(temperatures, dtype=float)[known]
+        t = np.asarray(times, dtype=np.int64)[known]
+        self.readings += len(known)
+        t, temps = t[reading], temps[reading]
+        self.evaluations += len(mon)
+        if not len(mon):
+            return []
+        order = np.lexsort((t, mon))
+        mon, t, temps = mon[order], t[order], temps[order]
+        idx = np.arange(len(mon))
+        starts = np.where(np.r_[True, mon[1:] != mon[:-1]], idx, 0)
+        rank = idx - np.maximum.accumulate(starts)
+        by_round = np.argsort(rank, kind="stable")
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+        events = []
+        for r in range(len(bounds) - 1):
+            sel = by_round[bounds[r]:bounds[r + 1]]
+            self._step(mon[sel], t[sel], temps[sel], events)
+        return events
+
+    def _step(self, m, t, temp, events):
+        # m holds distinct monitors
+        last = self.last_t[m]
+        dt = np.where(last >= 0, np.clip(t - last, 0, self.max_gap_s), 0) / 3600.0
+        b = t // self.bucket_s
+        cur = np.where(last >= 0, self.cur_b[m], b)
+        b = np.maximum(b, cur)  # late readings count towards the current bucket
+        # Expire the buckets the window slid past (at most n_buckets per monitor)
+        advance = np.minimum(b - cur, self.n_buckets)
+        for k in range(1, int(advance.max(initial=0)) + 1):
+            s = advance >= k
+            self.ring[m[s], (cur[s] + k) % self.n_buckets] = 0.0
+        excess = temp - self.threshold[m]
+        over = excess > 0
+        self.ring[m, b % self.n_buckets, 0] += np.where(over, excess * dt, 0.0)
+        self.ring[m, b % self.n_buckets, 1] += np.where(over, dt, 0.0)
+        self.last_t[m] = np.maximum(last, t)
+        self.cur_b[m] = b
+        totals = self.ring[m].sum(axis=1)
+        was_open = self.open[m]
+        opening = ~was_open & (totals >= self.limits - 1e-9)  # minute steps of 1/60 h add up to 3.9999...
+        resolving = was_open & (totals < self.limits * RESOLVE_FRACTION)
+        self.open[m] = (was_open | opening) & ~resolving
+        for i, k in zip(*np.nonzero(opening | resolving)):
+            events.append((int(m[i]), KINDS[k], "open" if opening[i, k] else "resolve", int(t[i]), float(totals[i, k])))
+
+    def write_events(self, conn, events):
+        opened, resolved = [], []
+        for m, kind, action, t, value in events:
+            stamp = time.strftime(LOG_TIME_FORMAT, time.gmtime(t))
+            for crop_name in self.crops[m]:
+                if action == "open":
+                    opened.append((int(self.facility[m]), crop_name, kind, float(self.threshold[m]), round(value, 3), stamp))
+                else:
+                    resolved.append((stamp, int(self.facility[m]), crop_name, kind))
+        # Ignored when the same alert is already open
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {ALERTS_TABLE} (facility_id, crop_name, kind, threshold, value, opened_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", opened
+        )
+        conn.executemany(
+            f"UPDATE {ALERTS_TABLE} SET resolved_at=? WHERE facility_id=? AND crop_name=? AND kind=? "
+            "AND resolved_at IS NULL", resolved
+        )
+        return len(opened), len(resolved)
+
+    def _save(self, m):
+        # Copies of the window state of monitors m (fancy indexing copies)
+        return m, self.last_t[m], self.cur_b[m], self.ring[m], self.open[m], self.readings, self.evaluations
+
+    def _restore(self, saved):
+        m, last_t, cur_b, ring, open_, self.readings, self.evaluations = saved
+        self.last_t[m] = last_t
+        self.cur_b[m] = cur_b
+        self.ring[m] = ring
+        self.open[m] = open_
+
+    def on_flush(self, conn, rows):
+        # SensorWriter flush hook: rows are (facility_id, temperature, humidity, log_time) tuples.
+        # Window state only moves on in apply(), once the flush has committed: a flush that rolls
+        # back is retried with the same rows, which must find the state (and open alerts) as before.
+        self._pending = None
+        if self.loaded_at is None or time.time() - self.loaded_at > MONITOR_REFRESH_S:
+            self.load(conn)
+        else:
+            init_db(conn)  # the flush that ran load() may have rolled back its CREATE TABLE
+        if not rows:
+            return
+        facility_ids, temperatures, _, log_times = zip(*rows)
+        before = self._save(np.unique(self._expand(facility_ids)[2]))
+        try:
+            events = self.process(facility_ids, temperatures, _to_seconds(log_times))
+            if events:
+                self.write_events(conn, events)
+            self._pending = self._save(before[0])
+        finally:
+            self._restore(before)
+
+    def apply(self, rows):
+        # SensorWriter listener, called after the flush transaction commits
+        if self._pending is not None:
+            self._restore(self._pending)
+            self._pending = None
+
+    def stats(self):
+        return {"monitors": len(self._members), "readings": self.readings, "evaluations": self.evaluations,
+                "open_alerts": int(self.open[self._members].sum())}
+
+def bench(n_facilities=10000, minutes=240, crops_per_facility=2, block_minutes=15, seed=42):
+    # Engine throughput on simulated sensor blocks (sensor_stream.SensorFleet), alerts written to an
+    # in-memory SQLite table; block generation is excluded from the timing
+    import sensor_stream
+    rng = np.random.default_rng(seed)
+    names = [c for c in CROP_TEMP_THRESHOLDS if c != "other"] + ["sorghum"]
+    crops = pd.DataFrame({
+        "facility_id": np.repeat(np.arange(1, n_facilities + 1), crops_per_facility),
+        "crop_name": rng.choice(names, n_facilities * crops_per_facility),
+    })
+    fleet = sensor_stream.SensorFleet(range(1, n_facilities + 1), seed)
+    blocks = []
+    for _ in range(0, minutes, block_minutes):
+        block = fleet.next_block(block_minutes)
+        blocks.append((block["facility_id"].to_numpy(), block["temperature"].to_numpy(), _to_seconds(block["log_time"])))
+    conn = sqlite3.connect(":memory:")
+    init_db(conn)
+    engine = AlertEngine()
+    engine.set_monitors(crops)
+    opened = resolved = 0
+    start = time.perf_counter()
+    for facility_ids, temperatures, times in blocks:
+        with conn:
+            o, r = engine.write_events(conn, engine.process(facility_ids, temperatures, times))
+        opened, resolved = opened + o, resolved + r
+    elapsed = time.perf_counter() - start
+    open_rows = conn.execute(f"SELECT COUNT(*) FROM {ALERTS_TABLE} WHERE resolved_at IS NULL").fetchone()[0]
+    print(f"{engine.readings:,} readings ({engine.evaluations:,} facility/crop evaluations) in {elapsed:.2f}s: "
+          f"{engine.readings / elapsed:,.0f} readings/s, {engine.evaluations / elapsed:,.0f} evaluations/s")
+    print(f"Alerts: {opened:,} opened, {resolved:,} resolved, {open_rows:,} open "
+          f"({len(engine._members):,} monitors, state {engine.ring.nbytes / max(len(engine.ring), 1):.0f} bytes each)")
+    return engine.readings / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the storage temperature alert engine")
+    parser.add_argument("--facilities", type=int, default=10000)
+    parser.add_argument("--minutes", type=int, default=240)
+    parser.add_argument("--crops", type=int, default=2, help="Crops per facility")
+    parser.add_argument("--block-minutes", type=int, default=15, help="Readings per batch, in minutes of data")
+    args = parser.parse_args()
+    bench(args.facilities, args.minutes, args.crops, args.block_minutes)
@@ -0,0 +1,219 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Time rollups for temp_logs in agriconnect_farmers.db: count, sum, min and max temperature per
+# facility in 5-minute, hourly and daily buckets. refresh() folds readings added since the last
+# refresh (tracked by log_id) into every level with one grouped upsert per level; the sensor
+# ingestion service runs it inside each flush transaction, and the charts try it without waiting
+# for the lock, so manual and sample readings are picked up too. Charts read whichever level fits the window
+# in MAX_POINTS rows, and compact() deletes raw readings (and fine buckets) past their retention.
+
+DB_PATH = "agriconnect_farmers.db"
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_POINTS = 800
+STATE_TABLE = "temp_rollup_state"
+
+# (table, bucket width in seconds, retention in days; None keeps everything)
+LEVELS = [
+    ("temp_rollup_5m", 300, 180),
+    ("temp_rollup_1h", 3600, 3 * 365),
+    ("temp_rollup_1d", 86400, None),
+]
+RAW_RETENTION_DAYS = 30
+# Readings are nominally a minute apart; used only to estimate how many raw rows a window holds
+RAW_STEP_SECONDS = 60
+COMPACT_FACILITIES_PER_TXN = 500
+# Chart window choices for the facility pages, in days (None: whole history)
+CHART_WINDOWS = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "Last year": 365, "All time": None}
+
+def _bucket(col, step):
+    # log_time is naive wall-clock text; reading it as UTC and formatting back as UTC is a no-op,
+    # so buckets line up with the text (daily buckets start at 00:00:00 of the logged date)
+    return f"datetime(CAST(strftime('%s', {col}) AS INTEGER) / {step} * {step}, 'unixepoch')"
+
+def _fold(conn, table, step, after, upto):
+    # Readings with after < log_id <= upto, grouped per bucket and merged into existing buckets
+    conn.execute(
+        f"INSERT INTO {table} (facility_id, bucket, n, sum_temp, min_temp, max_temp) "
+        f"SELECT facility_id, {_bucket('log_time', step)} AS b, COUNT(*), SUM(temperature), MIN(temperature), MAX(temperature) "
+        f"FROM temp_logs WHERE log_id > ? AND log_id <= ? AND temperature IS NOT NULL "
+        f"AND strftime('%s', log_time) IS NOT NULL GROUP BY facility_id, b "
+        f"ON CONFLICT(facility_id, bucket) DO UPDATE SET n = n + excluded.n, sum_temp = sum_temp + excluded.sum_temp, "
+        f"min_temp = MIN(min_temp, excluded.min_temp), max_temp = MAX(max_temp, excluded.max_temp)",
+        (after, upto)
+    )
+
+def _watermark(conn):
+    return conn.execute(f"SELECT log_id FROM {STATE_TABLE}").fetchone()[0]
+
+def refresh(conn):
+    # Runs in the caller's transaction (log_id is AUTOINCREMENT, so new readings always sort after
+    # the watermark). Returns the number of readings folded in.
+    if not conn.in_transaction:
+        # Take the write lock before reading the watermark, or a concurrent refresh (the ingestion
+        # writer's flush) could fold the same log_ids between our read and our first write
+        conn.execute("BEGIN IMMEDIATE")
+    after = _watermark(conn)
+    upto = conn.execute("SELECT MAX(log_id) FROM temp_logs").fetchone()[0] or 0
+    if upto <= after:
+        return 0
+    for table, step, _ in LEVELS:
+        _fold(conn, table, step, after, upto)
+    conn.execute(f"UPDATE {STATE_TABLE} SET log_id=?", (upto,))
+    return upto - after
+
+def rebuild(conn):
+    # Recomputes every level from temp_logs. Only complete before the first compact(): after that
+    # the raw rows behind old buckets are gone, so install() runs this only when it creates the tables.
+    for table, _, _ in LEVELS:
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute(f"UPDATE {STATE_TABLE} SET log_id=0")
+    refresh(conn)
+
+def install(conn):
+    # Idempotent; call after temp_logs exists. Commits.
+    with conn:
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (STATE_TABLE,)
+        ).fetchone() is None
+        for table, _, _ in LEVELS:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    facility_id INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    sum_temp REAL NOT NULL,
+                    min_temp REAL NOT NULL,
+                    max_temp REAL NOT NULL,
+                    PRIMARY KEY (facility_id, bucket)
+                ) WITHOUT ROWID
+            """)
+        if created:
+            conn.execute(f"CREATE TABLE {STATE_TABLE} (log_id INTEGER NOT NULL)")
+            conn.execute(f"INSERT INTO {STATE_TABLE} (log_id) VALUES (0)")
+            rebuild(conn)
+
+def choose_level(start, end, max_points=MAX_POINTS, now=None):
+    # Finest level that covers [start, end] in at most max_points rows and still holds data for start;
+    # None means raw readings
+    now = now or datetime.now()
+    span = (end - start).total_seconds()
+    if span / RAW_STEP_SECONDS <= max_points and start >= now - timedelta(days=RAW_RETENTION_DAYS):
+        return None
+    for table, step, keep_days in LEVELS:
+        if span / step <= max_points and (keep_days is None or start >= now - timedelta(days=keep_days)):
+            return table
+    return LEVELS[-1][0]
+
+def facility_span(conn, facility_id):
+    # (first, last) log time for a facility from the daily level and the raw index; (None, None) if no data
+    first = conn.execute(f"SELECT MIN(bucket) FROM {LEVELS[-1][0]} WHERE facility_id=?", (facility_id,)).fetchone()[0]
+    last = conn.execute("SELECT MAX(log_time) FROM temp_logs WHERE facility_id=?", (facility_id,)).fetchone()[0]
+    first = first or conn.execute("SELECT MIN(log_time) FROM temp_logs WHERE facility_id=?", (facility_id,)).fetchone()[0]
+    if first is None or last is None:
+        return None, None
+    return pd.Timestamp(first).to_pydatetime(), pd.Timestamp(last).to_pydatetime()
+
+def _floor(ts, level):
+    step = dict((t, s) for t, s, _ in LEVELS)[level]
+    epoch = int((ts - datetime(1970, 1, 1)).total_seconds()) // step * step
+    return (datetime(1970, 1, 1) + timedelta(seconds=epoch)).strftime(LOG_TIME_FORMAT)
+
+def try_refresh(db_path=DB_PATH):
+    # Best-effort refresh that never waits for the write lock: if anyone is writing (the ingestion
+    # service refreshes inside its own flushes) it gives up at once. Returns readings folded, or None.
+    conn = sqlite3.connect(db_path, timeout=0)
+    try:
+        with conn:
+            return refresh(conn)
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+def temp_series(facility_id, window_days=None, db_path=DB_PATH, max_points=MAX_POINTS, now=None):
+    # Chart data ending at the facility's latest reading: log_time, temperature (bucket mean),
+    # min_temp, max_temp, n. window_days=None covers the facility's whole history.
+    # Returns (DataFrame, level) where level is the rollup table used, or "raw".
+    # Reads only; manual and sample readings are folded in by a try_refresh() that never blocks.
+    try_refresh(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        first, last = facility_span(conn, facility_id)
+        if last is None:
+            return pd.DataFrame(columns=["log_time", "temperature", "min_temp", "max_temp", "n"]), "raw"
+        start = max(first, last - timedelta(days=window_days)) if window_days else first
+        level = choose_level(start, last, max_points, now)
+        lo, hi = start.strftime(LOG_TIME_FORMAT), last.strftime(LOG_TIME_FORMAT)
+        if level is None:
+            df = pd.read_sql_query(
+                "SELECT log_time, temperature, temperature AS min_temp, temperature AS max_temp, 1 AS n "
+                "FROM temp_logs WHERE facility_id=? AND log_time BETWEEN ? AND ? ORDER BY log_time",
+                conn, params=(facility_id, lo, hi)
+            )
+        else:
+            df = pd.read_sql_query(
+                f"SELECT bucket AS log_time, sum_temp / n AS temperature, min_temp, max_temp, n FROM {level} "
+                "WHERE facility_id=? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                conn, params=(facility_id, _floor(start, level), hi)
+            )
+        df["log_time"] = pd.to_datetime(df["log_time"])
+        return df, level or "raw"
+    finally:
+        conn.close()
+
+def compact(db_path=DB_PATH, now=None):
+    # Applies the retention policy. Raw readings older than RAW_RETENTION_DAYS are deleted except
+    # each facility's latest one (the PHL prompts read it). Deletes go facility by facility through
+    # ix_temp_logs_facility_time, in short transactions so ingestion is never blocked for long.
+    now = now or datetime.now()
+    start = time.time()
+    conn = sqlite3.connect(db_path, timeout=30)
+    removed = {}
+    try:
+        with conn:
+            refresh(conn)  # never delete readings that are not rolled up yet
+        raw_cutoff = (now - timedelta(days=RAW_RETENTION_DAYS)).strftime(LOG_TIME_FORMAT)
+        facilities = [r[0] for r in conn.execute("SELECT DISTINCT facility_id FROM temp_logs")]
+        removed["temp_logs"] = 0
+        for i in range(0, len(facilities), COMPACT_FACILITIES_PER_TXN):
+            with conn:
+                for facility_id in facilities[i:i + COMPACT_FACILITIES_PER_TXN]:
+                    latest = conn.execute(
+                        "SELECT MAX(log_time) FROM temp_logs WHERE facility_id=?", (facility_id,)
+                    ).fetchone()[0]
+                    removed["temp_logs"] += conn.execute(
+                        "DELETE FROM temp_logs WHERE facility_id=? AND log_time < ?",
+                        (facility_id, min(raw_cutoff, latest))
+                    ).rowcount
+        for table, _, keep_days in LEVELS:
+            if keep_days is not None:
+                cutoff = (now - timedelta(days=keep_days)).strftime(LOG_TIME_FORMAT)
+                with conn:
+                    removed[table] = conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (cutoff,)).rowcount
+    finally:
+        conn.close()
+    print(f"Compacted {db_path} in {time.time() - start:.1f}s: "
+          + ", ".join(f"{n:,} rows from {t}" for t, n in removed.items()))
+    return removed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain temp_logs rollups and apply the retention policy")
+    parser.add_argument("command", choices=["install", "rebuild", "compact"])
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--now", default=None, help="Retention reference time (default: current time)")
+    args = parser.parse_args()
+    if args.command == "compact":
+        compact(args.db, pd.Timestamp(args.now).to_pydatetime() if args.now else None)
+    else:
+        conn = sqlite3.connect(args.db)
+        install(conn)
+        if args.command == "rebuild":
+            with conn:
+                rebuild(conn)
+        conn.close()
+        print(f"Rollups on temp_logs are {'rebuilt' if args.command == 'rebuild' else 'installed'} in {args.db}.")
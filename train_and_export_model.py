@@ -3,6 +3,8 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import joblib
 
+import model_store
+
 # 1. Load your data
 df = pd.read_csv("youth_farmers.csv")
 df.columns = df.columns.str.strip()
@@ -73,4 +75,8 @@ print(f"Test accuracy: {acc:.2f}")
 
 # 7. Export the trained model
 joblib.dump(clf, "your_model.joblib")
-print("Model exported as your_model.joblib")
\ No newline at end of file
+print("Model exported as your_model.joblib")
+
+# 8. Register the model version so the scoring service can load the active model
+version = model_store.save_model(clf, feature_cols, "creditworthy")
+print(f"Model registered as creditworthy version {version}")
\ No newline at end of file
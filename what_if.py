@@ -0,0 +1,88 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import model_store
+from phl_credit_pipeline import MODEL_NAME, CREDIT_CSV
+
+# Actionable levers from the improvement advice; only those the active model uses get a slider
+WHAT_IF_FEATURES = ['financial_access', 'tech_literacy', 'cooperative_member', 'irrigation_access', 'interventions_adopted']
+CATEGORICAL_FEATURES = ['financial_access', 'tech_literacy']
+BINARY_FEATURES = ['cooperative_member', 'irrigation_access']
+
+class FastForest:
+    # Single-row fast path for a fitted RandomForestClassifier: calls each tree's low-level
+    # predict on a float32 row, skipping DataFrame construction and sklearn input validation.
+
+    def __init__(self, model):
+        self._trees = [est.tree_ for est in model.estimators_]
+        self._class_idx = list(model.classes_).index(1) if 1 in model.classes_ else 0
+
+    def score(self, row):
+        x = np.asarray(row, dtype=np.float32).reshape(1, -1)
+        total = 0.0
+        for tree in self._trees:
+            value = tree.predict(x)[0]
+            total += value[self._class_idx] / value.sum()
+        return total / len(self._trees)
+
+@lru_cache(maxsize=4)
+def _simulator_for(version):
+    model, meta = model_store.load_model(MODEL_NAME, version)
+    return FastForest(model), meta['features']
+
+def load_simulator():
+    # Cached per model version for the life of the process
+    version = model_store.get_active_version(MODEL_NAME)
+    if version is None:
+        raise FileNotFoundError(f"No active version for model {MODEL_NAME}")
+    return _simulator_for(version)
+
+@lru_cache(maxsize=1)
+def category_labels():
+    # build_features encodes categories alphabetically, so code i is the i-th sorted label.
+    # read_csv parses the "None" level as NaN, which cat.codes turns into -1.
+    raw = pd.read_csv(CREDIT_CSV, usecols=CATEGORICAL_FEATURES)
+    labels = {}
+    for col in CATEGORICAL_FEATURES:
+        codes = dict(enumerate(sorted(raw[col].dropna().unique().tolist())))
+        if raw[col].isna().any():
+            codes = {-1: "None", **codes}
+        labels[col] = codes
+    return labels
+
+def simulate(forest, features, record, overrides):
+    return forest.score([float(overrides.get(f, record[f])) for f in features])
+
+def render_what_if(record):
+    try:
+        forest, features = load_simulator()
+    except FileNotFoundError:
+        st.caption("What-if simulator unavailable: run phl_credit_pipeline.py to train the model.")
+        return
+    levers = [f for f in WHAT_IF_FEATURES if f in features and f in record]
+    with st.expander("🔮 What-if simulator"):
+        labels = category_labels()
+        overrides = {}
+        for f in levers:
+            key = f"what_if_{f}_{record.get('farmer_id', '')}"
+            current = int(record[f])
+            if f in CATEGORICAL_FEATURES:
+                options = list(labels[f].keys())
+                overrides[f] = st.select_slider(
+                    f.replace('_', ' ').title(), options=options, value=current,
+                    format_func=lambda i, f=f: labels[f][i], key=key
+                )
+            elif f in BINARY_FEATURES:
+                overrides[f] = int(st.toggle(f.replace('_', ' ').title(), value=bool(current), key=key))
+            else:
+                overrides[f] = st.slider(f.replace('_', ' ').title(), 0, max(3, current), current, key=key)
+        start = time.perf_counter()
+        simulated = simulate(forest, features, record, overrides)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        baseline = simulate(forest, features, record, {})
+        st.metric("Simulated credit score", f"{simulated:.2f}", delta=f"{simulated - baseline:+.2f}")
+        st.caption(f"Re-scored in {elapsed_ms:.1f} ms.")